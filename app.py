@@ -1,20 +1,57 @@
 import os
 import logging
+import platform
 from flask import Flask
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
 
+# orjson is CPython-only; under PyPy Flask's default JSON provider is kept
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if platform.python_implementation() == "PyPy":
+    try:
+        # Let SQLAlchemy's psycopg2 dialect load psycopg2cffi
+        from psycopg2cffi import compat
+        compat.register()
+    except ImportError:
+        pass
+
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
+# Numba dumps bytecode at DEBUG level while compiling kernels
+logging.getLogger("numba").setLevel(logging.WARNING)
 
 class Base(DeclarativeBase):
     pass
 
 db = SQLAlchemy(model_class=Base)
 
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping the str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj), mimetype="application/json"
+        )
+
 # Create the app
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
@@ -25,14 +62,37 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_pre_ping": True,
 }
 
+# Whether a sort answered from the result caches in routes.py is still
+# recorded as a session, so the stats count every request
+app.config["RECORD_CACHE_HITS"] = os.environ.get("RECORD_CACHE_HITS", "1") == "1"
+
+# Compress JSON responses, including the streamed step-by-step sorts.
+# zstd is preferred where the browser offers it; Flask-Compress cannot
+# stream gzip, so streamed responses fall back to deflate instead.
+app.config["COMPRESS_MIMETYPES"] = ["application/json", "application/x-ndjson"]
+app.config["COMPRESS_ALGORITHM"] = ["zstd", "br", "gzip"]
+app.config["COMPRESS_ALGORITHM_STREAMING"] = ["zstd", "br", "deflate"]
+app.config["COMPRESS_LEVEL"] = 6
+app.config["COMPRESS_ZSTD_LEVEL"] = 3
+
 # Initialize the app with the extension
 db.init_app(app)
+Compress(app)
 
 with app.app_context():
     # Import models to ensure tables are created
     import models
     db.create_all()
+    models.ensure_stats_index()
+
+# Share compiled Numba kernels between worker processes and restarts. Must be
+# set before the kernels module imports numba.
+os.environ.setdefault("NUMBA_CACHE_DIR", os.path.join(app.instance_path, "numba_cache"))
 
 # Import and register routes
 from routes import *
 
+# Record sorting sessions on a background thread
+import metrics_writer
+metrics_writer.start(app)
+
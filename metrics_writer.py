@@ -0,0 +1,195 @@
+"""
+Background writer that records finished sorts off the request path
+
+Routes queue each run with record(); a single daemon thread drains the
+queue in batches. Each batch is one executemany INSERT into SortingSession,
+committed on its own so the sessions are kept even if the following
+upsert into AlgorithmStats fails.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from models import SortingSession, AlgorithmStats
+
+# Write once this many runs are queued, or this long after the first one
+_BATCH_SIZE = 100
+_BATCH_WAIT = 0.2  # seconds
+
+# How long exit waits for queued runs to be written
+_EXIT_TIMEOUT = 5  # seconds
+
+# Dialect-specific INSERTs that support ON CONFLICT upserts
+_UPSERT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert
+}
+
+_q = queue.Queue()
+
+def record(session, wins=0):
+    """
+    Queue a finished sort, given as SortingSession column values, and
+    whether it won a race
+    """
+    # Stamp it now rather than when the batch is written
+    session.setdefault('timestamp', datetime.utcnow())
+    _q.put((session, wins))
+
+def flush(timeout=None):
+    """
+    Block until every queued run has been written, or timeout seconds have
+    passed. Returns whether the queue was drained.
+    """
+    with _q.all_tasks_done:
+        return _q.all_tasks_done.wait_for(lambda: not _q.unfinished_tasks, timeout)
+
+def start(app):
+    """Start the writer thread for app"""
+    with app.app_context():
+        _backfill_stats()
+
+    thread = threading.Thread(target=_drain, args=(app,), name='metrics-writer', daemon=True)
+    thread.start()
+    # Daemon threads are killed at exit; write what is still queued first,
+    # without hanging if the writer has stopped
+    atexit.register(flush, _EXIT_TIMEOUT)
+
+def _backfill_stats():
+    """
+    Fold sessions recorded before AlgorithmStats kept running averages into
+    it, once: only while no stats row has a run counted yet
+    """
+    if db.session.query(func.coalesce(func.sum(AlgorithmStats.total_runs), 0)).scalar():
+        return
+
+    sessions = db.session.query(
+        SortingSession.algorithm,
+        func.count(SortingSession.id),
+        func.avg(SortingSession.comparisons),
+        func.avg(SortingSession.swaps),
+        func.avg(SortingSession.execution_time)
+    ).group_by(SortingSession.algorithm).all()
+
+    rows = [{
+        'algorithm': algorithm,
+        'total_runs': runs,
+        'avg_comparisons': avg_comparisons or 0,
+        'avg_swaps': avg_swaps or 0,
+        'avg_execution_time': avg_execution_time or 0,
+        'wins': 0
+    } for algorithm, runs, avg_comparisons, avg_swaps, avg_execution_time in sessions]
+
+    if rows:
+        _upsert_stats(rows)
+        db.session.commit()
+
+def _drain(app):
+    while True:
+        batch = [_q.get()]
+        deadline = time.monotonic() + _BATCH_WAIT
+
+        while len(batch) < _BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(_q.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        try:
+            with app.app_context():
+                _write(batch)
+        except Exception:
+            # Keep the writer alive for the batches after this one
+            logging.exception('Failed to write %d sorting sessions', len(batch))
+        finally:
+            for _ in batch:
+                _q.task_done()
+
+def _write(batch):
+    """Insert a batch of sessions, then fold them into AlgorithmStats"""
+    sessions = [session for session, _ in batch]
+    try:
+        db.session.execute(SortingSession.__table__.insert(), sessions)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logging.exception('Failed to record %d sorting sessions', len(batch))
+        return
+
+    # Sum the batch per algorithm so each stats row is updated once
+    totals = {}
+    for session, wins in batch:
+        row = totals.setdefault(session['algorithm'], {
+            'algorithm': session['algorithm'],
+            'total_runs': 0,
+            'avg_comparisons': 0,
+            'avg_swaps': 0,
+            'avg_execution_time': 0,
+            'wins': 0
+        })
+        row['total_runs'] += 1
+        row['avg_comparisons'] += session['comparisons']
+        row['avg_swaps'] += session['swaps']
+        row['avg_execution_time'] += session['execution_time']
+        row['wins'] += wins
+
+    for row in totals.values():
+        row['avg_comparisons'] /= row['total_runs']
+        row['avg_swaps'] /= row['total_runs']
+        row['avg_execution_time'] /= row['total_runs']
+
+    try:
+        _upsert_stats(list(totals.values()))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logging.exception('Failed to update stats for %d sorting sessions', len(batch))
+
+def _merged_stats(new):
+    """
+    SET clause folding new, a row of batch means, into the running averages
+    """
+    stats = AlgorithmStats.__table__.c
+    runs = stats.total_runs
+    total = runs + new.total_runs
+    return {
+        'total_runs': total,
+        'avg_comparisons': (stats.avg_comparisons * runs + new.avg_comparisons * new.total_runs) / total,
+        'avg_swaps': (stats.avg_swaps * runs + new.avg_swaps * new.total_runs) / total,
+        'avg_execution_time': (stats.avg_execution_time * runs + new.avg_execution_time * new.total_runs) / total,
+        'wins': stats.wins + new.wins
+    }
+
+def _upsert_stats(rows):
+    """
+    Fold per-algorithm batch means into the running averages with one
+    INSERT ... ON CONFLICT DO UPDATE on the unique algorithm column, or an
+    UPDATE per row with an INSERT fallback on dialects without upserts
+    """
+    table = AlgorithmStats.__table__
+    insert = _UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+
+    if insert is None:
+        for row in rows:
+            update = table.update().where(table.c.algorithm == row['algorithm'])
+            if db.session.execute(update.values(_merged_stats(SimpleNamespace(**row)))).rowcount == 0:
+                db.session.execute(table.insert(), row)
+        return
+
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.algorithm],
+        set_=_merged_stats(statement.excluded)
+    )
+    db.session.execute(statement, rows)
@@ -1,8 +1,13 @@
 from app import db
 from datetime import datetime
+from sqlalchemy import inspect
 
 class SortingSession(db.Model):
     """Model to track sorting sessions and statistics"""
+    __table_args__ = (
+        db.Index('ix_ss_algo_ts', 'algorithm', 'timestamp'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     algorithm = db.Column(db.String(50), nullable=False)
     array_size = db.Column(db.Integer, nullable=False)
@@ -15,9 +20,44 @@ class SortingSession(db.Model):
 class AlgorithmStats(db.Model):
     """Model to store algorithm performance statistics"""
     id = db.Column(db.Integer, primary_key=True)
-    algorithm = db.Column(db.String(50), nullable=False)
+    algorithm = db.Column(db.String(50), nullable=False, unique=True, index=True)
     total_runs = db.Column(db.Integer, default=0)
     avg_comparisons = db.Column(db.Float, default=0.0)
     avg_swaps = db.Column(db.Float, default=0.0)
     avg_execution_time = db.Column(db.Float, default=0.0)
     wins = db.Column(db.Integer, default=0)  # Number of times this algorithm won in game mode
+
+def ensure_stats_index():
+    """
+    Give an algorithm_stats table created before algorithm was unique its
+    unique index, which the stats upsert's ON CONFLICT (algorithm) needs.
+    create_all() leaves existing tables alone, so it never adds it.
+    Duplicate rows for an algorithm are merged into the oldest one first.
+    """
+    table = AlgorithmStats.__table__
+    inspector = inspect(db.engine)
+    existing = inspector.get_indexes(table.name) + inspector.get_unique_constraints(table.name)
+    if any(index.get('unique', True) and index['column_names'] == ['algorithm'] for index in existing):
+        return
+    
+    kept = {}
+    for row in AlgorithmStats.query.order_by(AlgorithmStats.id):
+        first = kept.setdefault(row.algorithm, row)
+        if first is row:
+            continue
+        
+        runs = (first.total_runs or 0) + (row.total_runs or 0)
+        for column in ('avg_comparisons', 'avg_swaps', 'avg_execution_time'):
+            total = ((getattr(first, column) or 0) * (first.total_runs or 0)
+                     + (getattr(row, column) or 0) * (row.total_runs or 0))
+            setattr(first, column, total / runs if runs else 0.0)
+        first.total_runs = runs
+        first.wins = (first.wins or 0) + (row.wins or 0)
+        db.session.delete(row)
+    db.session.commit()
+    
+    # A plain index may already hold the name; replace it with the unique one
+    index = next(index for index in table.indexes if index.unique)
+    if any(existing_index['name'] == index.name for existing_index in existing):
+        index.drop(db.engine)
+    index.create(db.engine)
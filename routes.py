@@ -1,12 +1,242 @@
-from flask import render_template, request, jsonify
-from app import app, db
-from models import SortingSession, AlgorithmStats
+from flask import render_template, request, jsonify, Response, stream_with_context
+from app import app
+from models import AlgorithmStats
 from sorting_algorithms import (
     bubble_sort, insertion_sort, selection_sort, 
-    merge_sort, quick_sort, heap_sort
+    merge_sort, quick_sort, heap_sort,
+    bubble_sort_steps, insertion_sort_steps, selection_sort_steps,
+    merge_sort_steps, quick_sort_steps, heap_sort_steps,
+    counting_sort, is_small_range,
+    STEP_TYPES, MESSAGES, step_columns, load_kernels, as_int64
 )
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import threading
 import time
-import random
+import numpy as np
+import metrics_writer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Algorithm mapping
+_ALGORITHMS = {
+    'bubble': bubble_sort,
+    'insertion': insertion_sort,
+    'selection': selection_sort,
+    'merge': merge_sort,
+    'quick': quick_sort,
+    'heap': heap_sort
+}
+
+# Step generators used to stream step-by-step sorts
+_STEP_ALGORITHMS = {
+    'bubble': bubble_sort_steps,
+    'insertion': insertion_sort_steps,
+    'selection': selection_sort_steps,
+    'merge': merge_sort_steps,
+    'quick': quick_sort_steps,
+    'heap': heap_sort_steps
+}
+
+# PCG64 generator for random arrays, seeded once per process
+_rng = np.random.default_rng()
+
+# Steps packed into each streamed frame
+_STREAM_FRAME_STEPS = 256
+
+# Shared pool for /api/race, so requests don't each start and join their
+# own threads. The kernels release the GIL and race side by side; the Python
+# fallback holds it, so there racers run one at a time to keep each timing
+# clean. Calling load_kernels() here also compiles them ahead of the first
+# fast sort.
+_RACE_POOL = ThreadPoolExecutor(
+    max_workers=len(_ALGORITHMS) if load_kernels() else 1,
+    thread_name_prefix='race'
+)
+
+def _race_one(sort, array):
+    """Time one sort; runs on a race worker thread, so no DB access"""
+    start_ns = time.perf_counter_ns()
+    result = sort(array)
+    result['execution_time'] = (time.perf_counter_ns() - start_ns) / 1_000_000
+    return result
+
+class _LRUCache:
+    """
+    Thread-safe LRU cache bounded by the total size of its entries, each
+    entry's size being given when it is stored
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Cached value for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+    
+    def put(self, key, value, size=1):
+        """Store value, dropping the least recently used entries to fit it"""
+        if size > self.max_size:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_size:
+                _, (_, dropped) = self._entries.popitem(last=False)
+                self._size -= dropped
+
+# Results of recent fast sorts, keyed by (sort, values), as immutable
+# (sorted values, comparisons, swaps, execution time in ms) tuples. Each
+# entry holds the input and the sorted values, so the cache is bounded by
+# the total number of values held, and arrays longer than
+# _SORT_CACHE_ENTRY_VALUES are sorted without being cached.
+_SORT_CACHE_VALUES = 1024 * 1024
+_SORT_CACHE_ENTRY_VALUES = 64 * 1024
+_sort_cache = _LRUCache(_SORT_CACHE_VALUES)
+
+# Recently streamed step-by-step sorts, keyed by (algorithm, values,
+# verbose), are replayed from their encoded lines. The cache is bounded by
+# total bytes, and a stream stops being buffered, and is not cached, once
+# it outgrows _STREAM_CACHE_ENTRY_BYTES, so streaming memory stays bounded.
+_STREAM_CACHE_BYTES = 16 * 1024 * 1024
+_STREAM_CACHE_ENTRY_BYTES = 1024 * 1024
+_stream_cache = _LRUCache(_STREAM_CACHE_BYTES)
+
+def _timed_sort(sort, values):
+    """
+    Sort and time values, returning (sorted values, comparisons, swaps,
+    execution time in ms) with the sorted values as a tuple
+    """
+    start_ns = time.perf_counter_ns()
+    result = sort(values)
+    execution_time = (time.perf_counter_ns() - start_ns) / 1_000_000  # Convert to milliseconds
+    return (tuple(result['sorted_array']), result.get('comparisons', 0),
+            result.get('swaps', 0), execution_time)
+
+def _auto_sort(values, step_by_step):
+    """
+    Resolve 'auto' to an (algorithm, sort) pair: counting sort when the
+    values span a small range and no steps are wanted, quick sort otherwise
+    """
+    if not step_by_step and is_small_range(values):
+        return 'counting', counting_sort
+    return 'quick', quick_sort
+
+def _save_session(algorithm, array_size, result, execution_time, mode):
+    """Queue a finished sort to be recorded in the database"""
+    session = dict(
+        algorithm=algorithm,
+        array_size=array_size,
+        comparisons=result.get('comparisons', 0),
+        swaps=result.get('swaps', 0),
+        execution_time=execution_time,
+        mode=mode
+    )
+    metrics_writer.record(session)
+
+def _dumps(obj):
+    """Encode obj as compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode()
+
+def _ndjson_line(obj):
+    """Encode one line of an NDJSON stream"""
+    return _dumps(obj) + b'\n'
+
+def _stream_sort(algorithm, array, mode, verbose):
+    """
+    Stream a step-by-step sort as NDJSON. The first line names the step
+    type codes and message templates and carries the array the steps
+    replay from, then each line is a frame of up to _STREAM_FRAME_STEPS
+    steps packed as columns, and a final line with 'done' set carries the
+    result. Errors are sent as an 'error' line since the status code has
+    already gone out. A repeat of a recently streamed sort is replayed from
+    _stream_cache without sorting again, and is only recorded if
+    RECORD_CACHE_HITS is set.
+    """
+    def generate():
+        try:
+            key = (algorithm, tuple(array), verbose)
+            cached = _stream_cache.get(key)
+            if cached is not None:
+                lines, (result, execution_time) = cached
+                yield from lines
+                if app.config['RECORD_CACHE_HITS']:
+                    _save_session(algorithm, len(array), result, execution_time, mode)
+                return
+            
+            steps = _STEP_ALGORITHMS[algorithm](array, verbose=verbose)
+            elapsed_ns = 0
+            frame = []
+            # Lines kept for the cache, dropped once there are too many bytes
+            lines = []
+            size = 0
+            
+            def keep(line):
+                nonlocal lines, size
+                if lines is not None:
+                    size += len(line)
+                    if size > _STREAM_CACHE_ENTRY_BYTES:
+                        lines = None
+                    else:
+                        lines.append(line)
+                return line
+            
+            yield keep(_ndjson_line({'step_types': STEP_TYPES, 'messages': MESSAGES, 'initial_array': array}))
+            
+            while True:
+                # Only time the sort itself, not encoding or the client reading
+                start_ns = time.perf_counter_ns()
+                try:
+                    frame.append(next(steps))
+                except StopIteration as done:
+                    elapsed_ns += time.perf_counter_ns() - start_ns
+                    result = done.value
+                    break
+                elapsed_ns += time.perf_counter_ns() - start_ns
+                
+                if len(frame) == _STREAM_FRAME_STEPS:
+                    yield keep(_ndjson_line(step_columns(frame)))
+                    frame = []
+            
+            if frame:
+                yield keep(_ndjson_line(step_columns(frame)))
+            
+            execution_time = elapsed_ns / 1_000_000  # Convert to milliseconds
+            _save_session(algorithm, len(array), result, execution_time, mode)
+            
+            done = keep(_ndjson_line({
+                'done': True,
+                'sorted_array': result['sorted_array'],
+                'comparisons': result.get('comparisons', 0),
+                'swaps': result.get('swaps', 0),
+                'execution_time': execution_time
+            }))
+            if lines is not None:
+                summary = {'comparisons': result.get('comparisons', 0), 'swaps': result.get('swaps', 0)}
+                _stream_cache.put(key, (tuple(lines), (summary, execution_time)), size)
+            yield done
+        
+        except Exception as e:
+            yield _ndjson_line({'error': str(e)})
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @app.route('/')
 def index():
@@ -23,7 +253,7 @@ def generate_array():
     # Limit array size for performance
     size = min(max(size, 5), 100)
     
-    array = [random.randint(min_val, max_val) for _ in range(size)]
+    array = _rng.integers(min_val, max_val + 1, size=size, dtype=np.int64).tolist()
     return jsonify({'array': array})
 
 @app.route('/api/sort', methods=['POST'])
@@ -31,50 +261,57 @@ def sort_array():
     """Sort an array using specified algorithm"""
     data = request.get_json()
     algorithm = data.get('algorithm')
-    array = data.get('array', [])
+    array = data.get('array')
     step_by_step = data.get('stepByStep', False)
     
+    # 'auto' picks its sort once the values are known
+    sort = _auto_sort if algorithm == 'auto' else _ALGORITHMS.get(algorithm)
+    if sort is None:
+        return jsonify({'error': 'Invalid algorithm'}), 400
+    
     if not array:
         return jsonify({'error': 'No array provided'}), 400
     
-    # Algorithm mapping
-    algorithms = {
-        'bubble': bubble_sort,
-        'insertion': insertion_sort,
-        'selection': selection_sort,
-        'merge': merge_sort,
-        'quick': quick_sort,
-        'heap': heap_sort
-    }
+    # Accept the same input as /api/race in every mode. The kernels sort
+    # int64 buffers, so anything that would not pack into one is rejected
+    # rather than truncated or coerced by NumPy.
+    try:
+        values = as_int64(array)
+    except (TypeError, OverflowError):
+        return jsonify({'error': 'Array must contain integers'}), 400
     
-    if algorithm not in algorithms:
-        return jsonify({'error': 'Invalid algorithm'}), 400
+    if algorithm == 'auto':
+        algorithm, sort = sort(values, step_by_step)
+    
+    if step_by_step:
+        # Step messages are only sent if the client wants them
+        verbose = bool(data.get('verbose', True))
+        return _stream_sort(algorithm, values.tolist(), data.get('mode', 'learn'), verbose)
     
     try:
-        start_time = time.time()
-        result = algorithms[algorithm](array.copy(), step_by_step)
-        end_time = time.time()
-        
-        execution_time = (end_time - start_time) * 1000  # Convert to milliseconds
+        # A repeat of a recent sort reuses its result and timing
+        key = (sort, tuple(values)) if len(values) <= _SORT_CACHE_ENTRY_VALUES else None
+        cached = _sort_cache.get(key) if key is not None else None
+        if cached is None:
+            sorted_values, comparisons, swaps, execution_time = _timed_sort(sort, values)
+            if key is not None:
+                _sort_cache.put(key, (sorted_values, comparisons, swaps, execution_time), 2 * len(values))
+        else:
+            sorted_values, comparisons, swaps, execution_time = cached
         
         # Save session to database
-        session = SortingSession(
-            algorithm=algorithm,
-            array_size=len(array),
-            comparisons=result.get('comparisons', 0),
-            swaps=result.get('swaps', 0),
-            execution_time=execution_time,
-            mode=data.get('mode', 'learn')
-        )
-        db.session.add(session)
-        db.session.commit()
+        if cached is None or app.config['RECORD_CACHE_HITS']:
+            result = {'comparisons': comparisons, 'swaps': swaps}
+            _save_session(algorithm, len(array), result, execution_time, data.get('mode', 'learn'))
         
         return jsonify({
-            'sorted_array': result['sorted_array'],
-            'steps': result.get('steps', []),
-            'comparisons': result.get('comparisons', 0),
-            'swaps': result.get('swaps', 0),
-            'execution_time': execution_time
+            'algorithm': algorithm,
+            'sorted_array': list(sorted_values),
+            'steps': [],
+            'comparisons': comparisons,
+            'swaps': swaps,
+            'execution_time': execution_time,
+            'cached': cached is not None
         })
     
     except Exception as e:
@@ -85,119 +322,120 @@ def race_algorithms():
     """Race multiple algorithms against each other"""
     data = request.get_json()
     algorithms_to_race = data.get('algorithms', ['bubble', 'insertion', 'selection'])
-    array = data.get('array', [])
+    array = data.get('array')
     
     if not array:
         return jsonify({'error': 'No array provided'}), 400
     
-    # Algorithm mapping
-    algorithms = {
-        'bubble': bubble_sort,
-        'insertion': insertion_sort,
-        'selection': selection_sort,
-        'merge': merge_sort,
-        'quick': quick_sort,
-        'heap': heap_sort
+    # Resolve the racers once, dropping unknown names and duplicates
+    to_race = {
+        name: sort for name in dict.fromkeys(algorithms_to_race)
+        if (sort := _ALGORITHMS.get(name)) is not None
     }
+    if not to_race:
+        return jsonify({'error': 'No valid algorithms provided'}), 400
+    
+    # Validate and pack once; every sort copies the int64 buffer it needs
+    try:
+        values = as_int64(array)
+    except (TypeError, OverflowError):
+        return jsonify({'error': 'Array must contain integers'}), 400
     
     results = {}
+    race_sessions = []
     
-    for algo_name in algorithms_to_race:
-        if algo_name in algorithms:
-            try:
-                start_time = time.time()
-                result = algorithms[algo_name](array.copy(), True)
-                end_time = time.time()
-                
-                execution_time = (end_time - start_time) * 1000
-                
-                results[algo_name] = {
-                    'steps': result.get('steps', []),
-                    'comparisons': result.get('comparisons', 0),
-                    'swaps': result.get('swaps', 0),
-                    'execution_time': execution_time,
-                    'sorted_array': result['sorted_array']
-                }
-                
-                # Save race session
-                session = SortingSession(
-                    algorithm=algo_name,
-                    array_size=len(array),
-                    comparisons=result.get('comparisons', 0),
-                    swaps=result.get('swaps', 0),
-                    execution_time=execution_time,
-                    mode='game'
-                )
-                db.session.add(session)
-                
-            except Exception as e:
-                results[algo_name] = {'error': str(e)}
+    futures = {
+        algo_name: _RACE_POOL.submit(_race_one, sort, values)
+        for algo_name, sort in to_race.items()
+    }
     
-    # Determine winner (fastest execution time)
+    # Collect in request order and write the sessions back on this thread,
+    # since the SQLAlchemy session is not thread-safe
+    for algo_name, future in futures.items():
+        try:
+            result = future.result()
+            execution_time = result['execution_time']
+            
+            results[algo_name] = {
+                'steps': [],
+                'comparisons': result.get('comparisons', 0),
+                'swaps': result.get('swaps', 0),
+                'execution_time': execution_time,
+                'sorted_array': result['sorted_array']
+            }
+            
+            # Recorded once the winner is known
+            race_sessions.append(dict(
+                algorithm=algo_name,
+                array_size=len(array),
+                comparisons=result.get('comparisons', 0),
+                swaps=result.get('swaps', 0),
+                execution_time=execution_time,
+                mode='game'
+            ))
+            
+        except Exception as e:
+            results[algo_name] = {'error': str(e)}
+    
+    # Determine winner (fastest execution time). Both stay None if every
+    # racer failed: an inf sentinel is not valid JSON.
     winner = None
-    fastest_time = float('inf')
+    fastest_time = None
     
     for algo_name, result in results.items():
-        if 'error' not in result and result['execution_time'] < fastest_time:
+        if 'error' in result:
+            continue
+        if fastest_time is None or result['execution_time'] < fastest_time:
             fastest_time = result['execution_time']
             winner = algo_name
     
-    if winner:
-        # Update winner statistics
-        stats = AlgorithmStats.query.filter_by(algorithm=winner).first()
-        if stats:
-            stats.wins += 1
-        else:
-            stats = AlgorithmStats(algorithm=winner, wins=1)
-            db.session.add(stats)
-    
-    db.session.commit()
+    # The winner's stats row also gets its win
+    for session in race_sessions:
+        metrics_writer.record(session, wins=1 if session['algorithm'] == winner else 0)
     
     return jsonify({
         'results': results,
         'winner': winner,
-        'fastest_time': fastest_time if fastest_time != float('inf') else None
+        'fastest_time': fastest_time
     })
 
-@app.route('/api/algorithm-info/<algorithm>')
-def algorithm_info(algorithm):
-    """Get detailed information about a specific algorithm"""
-    algorithm_data = {
-        'bubble': {
-            'name': 'Bubble Sort',
-            'description': 'Bubble sort is like bubbles rising to the surface! It compares neighboring elements and swaps them if they\'re in the wrong order. The largest elements "bubble up" to the end with each pass through the array. It\'s simple to understand but slow for large datasets.',
-            'detailed_explanation': 'Bubble sort works by repeatedly stepping through the list, comparing each pair of adjacent items and swapping them if they are in the wrong order. The pass through the list is repeated until the list is sorted. The algorithm gets its name from the way smaller or larger elements "bubble" to the top of the list.',
-            'how_it_works': [
-                'Start at the beginning of the array',
-                'Compare the first two elements',
-                'If they are in the wrong order, swap them',
-                'Move to the next pair and repeat',
-                'Continue until you reach the end',
-                'Repeat the entire process until no swaps are needed'
-            ],
-            'time_complexity': {
-                'best': 'O(n)',
-                'average': 'O(n²)',
-                'worst': 'O(n²)'
-            },
-            'space_complexity': 'O(1)',
-            'stable': True,
-            'adaptive': True,
-            'applications': [
-                'Teaching basic sorting concepts to beginners',
-                'Small datasets (under 50 elements)',
-                'Nearly sorted data where few swaps are needed',
-                'Situations where simplicity is more important than efficiency'
-            ],
-            'code': {
-                'python': '''def bubble_sort(arr):
+# Static algorithm metadata, serialized once at import
+algorithm_data = {
+    'bubble': {
+        'name': 'Bubble Sort',
+        'description': 'Bubble sort is like bubbles rising to the surface! It compares neighboring elements and swaps them if they\'re in the wrong order. The largest elements "bubble up" to the end with each pass through the array. It\'s simple to understand but slow for large datasets.',
+        'detailed_explanation': 'Bubble sort works by repeatedly stepping through the list, comparing each pair of adjacent items and swapping them if they are in the wrong order. The pass through the list is repeated until the list is sorted. The algorithm gets its name from the way smaller or larger elements "bubble" to the top of the list.',
+        'how_it_works': [
+            'Start at the beginning of the array',
+            'Compare the first two elements',
+            'If they are in the wrong order, swap them',
+            'Move to the next pair and repeat',
+            'Continue until you reach the end',
+            'Repeat the entire process until no swaps are needed'
+        ],
+        'time_complexity': {
+            'best': 'O(n)',
+            'average': 'O(n²)',
+            'worst': 'O(n²)'
+        },
+        'space_complexity': 'O(1)',
+        'stable': True,
+        'adaptive': True,
+        'applications': [
+            'Teaching basic sorting concepts to beginners',
+            'Small datasets (under 50 elements)',
+            'Nearly sorted data where few swaps are needed',
+            'Situations where simplicity is more important than efficiency'
+        ],
+        'code': {
+            'python': '''def bubble_sort(arr):
     n = len(arr)
     for i in range(n):
         for j in range(0, n - i - 1):
             if arr[j] > arr[j + 1]:
                 arr[j], arr[j + 1] = arr[j + 1], arr[j]
     return arr''',
-                'javascript': '''function bubbleSort(arr) {
+            'javascript': '''function bubbleSort(arr) {
     const n = arr.length;
     for (let i = 0; i < n; i++) {
         for (let j = 0; j < n - i - 1; j++) {
@@ -208,7 +446,7 @@ def algorithm_info(algorithm):
     }
     return arr;
 }''',
-                'java': '''public static void bubbleSort(int[] arr) {
+            'java': '''public static void bubbleSort(int[] arr) {
     int n = arr.length;
     for (int i = 0; i < n; i++) {
         for (int j = 0; j < n - i - 1; j++) {
@@ -221,7 +459,7 @@ def algorithm_info(algorithm):
         }
     }
 }''',
-                'cpp': '''void bubbleSort(vector<int>& arr) {
+            'cpp': '''void bubbleSort(vector<int>& arr) {
     int n = arr.size();
     for (int i = 0; i < n; i++) {
         for (int j = 0; j < n - i - 1; j++) {
@@ -231,7 +469,7 @@ def algorithm_info(algorithm):
         }
     }
 }''',
-                'c': '''void bubbleSort(int arr[], int n) {
+            'c': '''void bubbleSort(int arr[], int n) {
     for (int i = 0; i < n; i++) {
         for (int j = 0; j < n - i - 1; j++) {
             if (arr[j] > arr[j + 1]) {
@@ -243,36 +481,36 @@ def algorithm_info(algorithm):
         }
     }
 }'''
-            }
+        }
+    },
+    'insertion': {
+        'name': 'Insertion Sort',
+        'description': 'Insertion sort works like sorting playing cards in your hand. You pick up cards one by one and insert each card into its correct position among the cards you\'ve already sorted. It\'s efficient for small datasets and works great when data is already mostly sorted.',
+        'detailed_explanation': 'Insertion sort builds the final sorted array one item at a time. It removes one element from the input data, finds the location it belongs within the sorted list, and inserts it there. It repeats until no input elements remain.',
+        'how_it_works': [
+            'Start with the second element (assume first is sorted)',
+            'Compare it with elements in the sorted portion',
+            'Shift larger elements to the right',
+            'Insert the current element in its correct position',
+            'Move to the next element and repeat',
+            'Continue until all elements are processed'
+        ],
+        'time_complexity': {
+            'best': 'O(n)',
+            'average': 'O(n²)',
+            'worst': 'O(n²)'
         },
-        'insertion': {
-            'name': 'Insertion Sort',
-            'description': 'Insertion sort works like sorting playing cards in your hand. You pick up cards one by one and insert each card into its correct position among the cards you\'ve already sorted. It\'s efficient for small datasets and works great when data is already mostly sorted.',
-            'detailed_explanation': 'Insertion sort builds the final sorted array one item at a time. It removes one element from the input data, finds the location it belongs within the sorted list, and inserts it there. It repeats until no input elements remain.',
-            'how_it_works': [
-                'Start with the second element (assume first is sorted)',
-                'Compare it with elements in the sorted portion',
-                'Shift larger elements to the right',
-                'Insert the current element in its correct position',
-                'Move to the next element and repeat',
-                'Continue until all elements are processed'
-            ],
-            'time_complexity': {
-                'best': 'O(n)',
-                'average': 'O(n²)',
-                'worst': 'O(n²)'
-            },
-            'space_complexity': 'O(1)',
-            'stable': True,
-            'adaptive': True,
-            'applications': [
-                'Small datasets (very efficient for arrays with fewer than 50 elements)',
-                'Nearly sorted data (performs excellently when data is almost in order)',
-                'Online algorithm (can sort data as it arrives)',
-                'As a final stage of more complex algorithms like quicksort'
-            ],
-            'code': {
-                'python': '''def insertion_sort(arr):
+        'space_complexity': 'O(1)',
+        'stable': True,
+        'adaptive': True,
+        'applications': [
+            'Small datasets (very efficient for arrays with fewer than 50 elements)',
+            'Nearly sorted data (performs excellently when data is almost in order)',
+            'Online algorithm (can sort data as it arrives)',
+            'As a final stage of more complex algorithms like quicksort'
+        ],
+        'code': {
+            'python': '''def insertion_sort(arr):
     for i in range(1, len(arr)):
         key = arr[i]
         j = i - 1
@@ -281,7 +519,7 @@ def algorithm_info(algorithm):
             j -= 1
         arr[j + 1] = key
     return arr''',
-                'javascript': '''function insertionSort(arr) {
+            'javascript': '''function insertionSort(arr) {
     for (let i = 1; i < arr.length; i++) {
         const key = arr[i];
         let j = i - 1;
@@ -293,7 +531,7 @@ def algorithm_info(algorithm):
     }
     return arr;
 }''',
-                'java': '''public static void insertionSort(int[] arr) {
+            'java': '''public static void insertionSort(int[] arr) {
     for (int i = 1; i < arr.length; i++) {
         int key = arr[i];
         int j = i - 1;
@@ -304,7 +542,7 @@ def algorithm_info(algorithm):
         arr[j + 1] = key;
     }
 }''',
-                'cpp': '''void insertionSort(vector<int>& arr) {
+            'cpp': '''void insertionSort(vector<int>& arr) {
     for (int i = 1; i < arr.size(); i++) {
         int key = arr[i];
         int j = i - 1;
@@ -315,7 +553,7 @@ def algorithm_info(algorithm):
         arr[j + 1] = key;
     }
 }''',
-                'c': '''void insertionSort(int arr[], int n) {
+            'c': '''void insertionSort(int arr[], int n) {
     for (int i = 1; i < n; i++) {
         int key = arr[i];
         int j = i - 1;
@@ -326,26 +564,26 @@ def algorithm_info(algorithm):
         arr[j + 1] = key;
     }
 }'''
-            }
+        }
+    },
+    'selection': {
+        'name': 'Selection Sort',
+        'description': 'Selection sort divides the list into sorted and unsorted regions, repeatedly selecting the minimum element from the unsorted region.',
+        'time_complexity': {
+            'best': 'O(n²)',
+            'average': 'O(n²)',
+            'worst': 'O(n²)'
         },
-        'selection': {
-            'name': 'Selection Sort',
-            'description': 'Selection sort divides the list into sorted and unsorted regions, repeatedly selecting the minimum element from the unsorted region.',
-            'time_complexity': {
-                'best': 'O(n²)',
-                'average': 'O(n²)',
-                'worst': 'O(n²)'
-            },
-            'space_complexity': 'O(1)',
-            'stable': False,
-            'adaptive': False,
-            'applications': [
-                'Small datasets',
-                'Memory-limited environments',
-                'When simplicity is preferred'
-            ],
-            'code': {
-                'python': '''def selection_sort(arr):
+        'space_complexity': 'O(1)',
+        'stable': False,
+        'adaptive': False,
+        'applications': [
+            'Small datasets',
+            'Memory-limited environments',
+            'When simplicity is preferred'
+        ],
+        'code': {
+            'python': '''def selection_sort(arr):
     for i in range(len(arr)):
         min_idx = i
         for j in range(i + 1, len(arr)):
@@ -353,7 +591,7 @@ def algorithm_info(algorithm):
                 min_idx = j
         arr[i], arr[min_idx] = arr[min_idx], arr[i]
     return arr''',
-                'javascript': '''function selectionSort(arr) {
+            'javascript': '''function selectionSort(arr) {
     for (let i = 0; i < arr.length; i++) {
         let minIdx = i;
         for (let j = i + 1; j < arr.length; j++) {
@@ -365,7 +603,7 @@ def algorithm_info(algorithm):
     }
     return arr;
 }''',
-                'java': '''public static void selectionSort(int[] arr) {
+            'java': '''public static void selectionSort(int[] arr) {
     for (int i = 0; i < arr.length; i++) {
         int minIdx = i;
         for (int j = i + 1; j < arr.length; j++) {
@@ -379,7 +617,7 @@ def algorithm_info(algorithm):
         arr[minIdx] = temp;
     }
 }''',
-                'cpp': '''void selectionSort(vector<int>& arr) {
+            'cpp': '''void selectionSort(vector<int>& arr) {
     for (int i = 0; i < arr.size(); i++) {
         int minIdx = i;
         for (int j = i + 1; j < arr.size(); j++) {
@@ -390,7 +628,7 @@ def algorithm_info(algorithm):
         swap(arr[i], arr[minIdx]);
     }
 }''',
-                'c': '''void selectionSort(int arr[], int n) {
+            'c': '''void selectionSort(int arr[], int n) {
     for (int i = 0; i < n; i++) {
         int minIdx = i;
         for (int j = i + 1; j < n; j++) {
@@ -404,36 +642,36 @@ def algorithm_info(algorithm):
         arr[minIdx] = temp;
     }
 }'''
-            }
+        }
+    },
+    'merge': {
+        'name': 'Merge Sort',
+        'description': 'Merge sort uses the "divide and conquer" strategy - like organizing a messy room by dividing it into smaller sections, cleaning each section, then combining them back together. It splits the array in half repeatedly until each piece has just one element, then merges them back in sorted order.',
+        'detailed_explanation': 'Merge sort is a divide-and-conquer algorithm that works by dividing the unsorted list into n sublists, each containing one element, then repeatedly merging sublists to produce new sorted sublists until there is only one sublist remaining.',
+        'how_it_works': [
+            'Divide the array into two halves',
+            'Recursively sort both halves',
+            'Merge the two sorted halves back together',
+            'Continue dividing until each piece has one element',
+            'Merge pieces back together in sorted order',
+            'Result is a completely sorted array'
+        ],
+        'time_complexity': {
+            'best': 'O(n log n)',
+            'average': 'O(n log n)',
+            'worst': 'O(n log n)'
         },
-        'merge': {
-            'name': 'Merge Sort',
-            'description': 'Merge sort uses the "divide and conquer" strategy - like organizing a messy room by dividing it into smaller sections, cleaning each section, then combining them back together. It splits the array in half repeatedly until each piece has just one element, then merges them back in sorted order.',
-            'detailed_explanation': 'Merge sort is a divide-and-conquer algorithm that works by dividing the unsorted list into n sublists, each containing one element, then repeatedly merging sublists to produce new sorted sublists until there is only one sublist remaining.',
-            'how_it_works': [
-                'Divide the array into two halves',
-                'Recursively sort both halves',
-                'Merge the two sorted halves back together',
-                'Continue dividing until each piece has one element',
-                'Merge pieces back together in sorted order',
-                'Result is a completely sorted array'
-            ],
-            'time_complexity': {
-                'best': 'O(n log n)',
-                'average': 'O(n log n)',
-                'worst': 'O(n log n)'
-            },
-            'space_complexity': 'O(n)',
-            'stable': True,
-            'adaptive': False,
-            'applications': [
-                'Large datasets where consistent performance is needed',
-                'External sorting (when data doesn\'t fit in memory)',
-                'When stability is required (keeping equal elements in original order)',
-                'Parallel processing (easy to implement across multiple processors)'
-            ],
-            'code': {
-                'python': '''def merge_sort(arr):
+        'space_complexity': 'O(n)',
+        'stable': True,
+        'adaptive': False,
+        'applications': [
+            'Large datasets where consistent performance is needed',
+            'External sorting (when data doesn\'t fit in memory)',
+            'When stability is required (keeping equal elements in original order)',
+            'Parallel processing (easy to implement across multiple processors)'
+        ],
+        'code': {
+            'python': '''def merge_sort(arr):
     if len(arr) <= 1:
         return arr
     
@@ -458,7 +696,7 @@ def merge(left, right):
     result.extend(left[i:])
     result.extend(right[j:])
     return result''',
-                'javascript': '''function mergeSort(arr) {
+            'javascript': '''function mergeSort(arr) {
     if (arr.length <= 1) return arr;
     
     const mid = Math.floor(arr.length / 2);
@@ -482,7 +720,7 @@ function merge(left, right) {
     
     return result.concat(left.slice(i), right.slice(j));
 }''',
-                'java': '''public static void mergeSort(int[] arr, int left, int right) {
+            'java': '''public static void mergeSort(int[] arr, int left, int right) {
     if (left < right) {
         int mid = left + (right - left) / 2;
         mergeSort(arr, left, mid);
@@ -510,7 +748,7 @@ public static void merge(int[] arr, int left, int mid, int right) {
         arr[i] = temp[i - left];
     }
 }''',
-                'cpp': '''void mergeSort(vector<int>& arr, int left, int right) {
+            'cpp': '''void mergeSort(vector<int>& arr, int left, int right) {
     if (left < right) {
         int mid = left + (right - left) / 2;
         mergeSort(arr, left, mid);
@@ -538,7 +776,7 @@ void merge(vector<int>& arr, int left, int mid, int right) {
         arr[i] = temp[i - left];
     }
 }''',
-                'c': '''void mergeSort(int arr[], int left, int right) {
+            'c': '''void mergeSort(int arr[], int left, int right) {
     if (left < right) {
         int mid = left + (right - left) / 2;
         mergeSort(arr, left, mid);
@@ -566,36 +804,36 @@ void merge(int arr[], int left, int mid, int right) {
         arr[i] = temp[i - left];
     }
 }'''
-            }
+        }
+    },
+    'quick': {
+        'name': 'Quick Sort',
+        'description': 'Quick sort is like organizing people by height: pick someone as a reference point (pivot), put shorter people on one side and taller people on the other, then repeat for each group. It\'s very fast on average and sorts in-place, making it popular for general-purpose sorting.',
+        'detailed_explanation': 'Quicksort is a divide-and-conquer algorithm that works by selecting a \'pivot\' element from the array and partitioning the other elements into two sub-arrays according to whether they are less than or greater than the pivot.',
+        'how_it_works': [
+            'Choose a pivot element from the array',
+            'Partition: rearrange array so elements smaller than pivot come before it',
+            'Elements greater than pivot come after it',
+            'Recursively apply same process to sub-arrays',
+            'Continue until all sub-arrays are sorted',
+            'No merging step needed - array is sorted in place'
+        ],
+        'time_complexity': {
+            'best': 'O(n log n)',
+            'average': 'O(n log n)',
+            'worst': 'O(n²)'
         },
-        'quick': {
-            'name': 'Quick Sort',
-            'description': 'Quick sort is like organizing people by height: pick someone as a reference point (pivot), put shorter people on one side and taller people on the other, then repeat for each group. It\'s very fast on average and sorts in-place, making it popular for general-purpose sorting.',
-            'detailed_explanation': 'Quicksort is a divide-and-conquer algorithm that works by selecting a \'pivot\' element from the array and partitioning the other elements into two sub-arrays according to whether they are less than or greater than the pivot.',
-            'how_it_works': [
-                'Choose a pivot element from the array',
-                'Partition: rearrange array so elements smaller than pivot come before it',
-                'Elements greater than pivot come after it',
-                'Recursively apply same process to sub-arrays',
-                'Continue until all sub-arrays are sorted',
-                'No merging step needed - array is sorted in place'
-            ],
-            'time_complexity': {
-                'best': 'O(n log n)',
-                'average': 'O(n log n)',
-                'worst': 'O(n²)'
-            },
-            'space_complexity': 'O(log n)',
-            'stable': False,
-            'adaptive': False,
-            'applications': [
-                'General-purpose sorting (most common choice)',
-                'Large datasets where average performance matters',
-                'In-place sorting when memory is limited',
-                'Built into many programming language libraries'
-            ],
-            'code': {
-                'python': '''def quick_sort(arr, low=0, high=None):
+        'space_complexity': 'O(log n)',
+        'stable': False,
+        'adaptive': False,
+        'applications': [
+            'General-purpose sorting (most common choice)',
+            'Large datasets where average performance matters',
+            'In-place sorting when memory is limited',
+            'Built into many programming language libraries'
+        ],
+        'code': {
+            'python': '''def quick_sort(arr, low=0, high=None):
     if high is None:
         high = len(arr) - 1
     
@@ -617,7 +855,7 @@ def partition(arr, low, high):
     
     arr[i + 1], arr[high] = arr[high], arr[i + 1]
     return i + 1''',
-                'javascript': '''function quickSort(arr, low = 0, high = arr.length - 1) {
+            'javascript': '''function quickSort(arr, low = 0, high = arr.length - 1) {
     if (low < high) {
         const pi = partition(arr, low, high);
         quickSort(arr, low, pi - 1);
@@ -640,7 +878,7 @@ function partition(arr, low, high) {
     [arr[i + 1], arr[high]] = [arr[high], arr[i + 1]];
     return i + 1;
 }''',
-                'java': '''public static void quickSort(int[] arr, int low, int high) {
+            'java': '''public static void quickSort(int[] arr, int low, int high) {
     if (low < high) {
         int pi = partition(arr, low, high);
         quickSort(arr, low, pi - 1);
@@ -666,7 +904,7 @@ public static int partition(int[] arr, int low, int high) {
     arr[high] = temp;
     return i + 1;
 }''',
-                'cpp': '''void quickSort(vector<int>& arr, int low, int high) {
+            'cpp': '''void quickSort(vector<int>& arr, int low, int high) {
     if (low < high) {
         int pi = partition(arr, low, high);
         quickSort(arr, low, pi - 1);
@@ -688,7 +926,7 @@ int partition(vector<int>& arr, int low, int high) {
     swap(arr[i + 1], arr[high]);
     return i + 1;
 }''',
-                'c': '''void quickSort(int arr[], int low, int high) {
+            'c': '''void quickSort(int arr[], int low, int high) {
     if (low < high) {
         int pi = partition(arr, low, high);
         quickSort(arr, low, pi - 1);
@@ -714,26 +952,26 @@ int partition(int arr[], int low, int high) {
     arr[high] = temp;
     return i + 1;
 }'''
-            }
+        }
+    },
+    'heap': {
+        'name': 'Heap Sort',
+        'description': 'Heap sort builds a binary heap from the array and repeatedly extracts the maximum element to build the sorted array.',
+        'time_complexity': {
+            'best': 'O(n log n)',
+            'average': 'O(n log n)',
+            'worst': 'O(n log n)'
         },
-        'heap': {
-            'name': 'Heap Sort',
-            'description': 'Heap sort builds a binary heap from the array and repeatedly extracts the maximum element to build the sorted array.',
-            'time_complexity': {
-                'best': 'O(n log n)',
-                'average': 'O(n log n)',
-                'worst': 'O(n log n)'
-            },
-            'space_complexity': 'O(1)',
-            'stable': False,
-            'adaptive': False,
-            'applications': [
-                'Priority queues',
-                'When consistent O(n log n) performance is needed',
-                'Memory-constrained environments'
-            ],
-            'code': {
-                'python': '''def heap_sort(arr):
+        'space_complexity': 'O(1)',
+        'stable': False,
+        'adaptive': False,
+        'applications': [
+            'Priority queues',
+            'When consistent O(n log n) performance is needed',
+            'Memory-constrained environments'
+        ],
+        'code': {
+            'python': '''def heap_sort(arr):
     n = len(arr)
     
     # Build max heap
@@ -761,7 +999,7 @@ def heapify(arr, n, i):
     if largest != i:
         arr[i], arr[largest] = arr[largest], arr[i]
         heapify(arr, n, largest)''',
-                'javascript': '''function heapSort(arr) {
+            'javascript': '''function heapSort(arr) {
     const n = arr.length;
     
     // Build max heap
@@ -796,7 +1034,7 @@ function heapify(arr, n, i) {
         heapify(arr, n, largest);
     }
 }''',
-                'java': '''public static void heapSort(int[] arr) {
+            'java': '''public static void heapSort(int[] arr) {
     int n = arr.length;
     
     // Build max heap
@@ -833,7 +1071,7 @@ public static void heapify(int[] arr, int n, int i) {
         heapify(arr, n, largest);
     }
 }''',
-                'cpp': '''void heapSort(vector<int>& arr) {
+            'cpp': '''void heapSort(vector<int>& arr) {
     int n = arr.size();
     
     // Build max heap
@@ -866,7 +1104,7 @@ void heapify(vector<int>& arr, int n, int i) {
         heapify(arr, n, largest);
     }
 }''',
-                'c': '''void heapSort(int arr[], int n) {
+            'c': '''void heapSort(int arr[], int n) {
     // Build max heap
     for (int i = n / 2 - 1; i >= 0; i--) {
         heapify(arr, n, i);
@@ -901,39 +1139,65 @@ void heapify(int arr[], int n, int i) {
         heapify(arr, n, largest);
     }
 }'''
-            }
         }
     }
-    
-    if algorithm in algorithm_data:
-        return jsonify(algorithm_data[algorithm])
-    else:
-        return jsonify({'error': 'Algorithm not found'}), 404
+}
+
+_ALGO_JSON = {name: _dumps(info) for name, info in algorithm_data.items()}
+_ALGO_ETAGS = {
+    name: hashlib.blake2b(blob, digest_size=8).hexdigest()
+    for name, blob in _ALGO_JSON.items()
+}
+_ALGO_NOT_FOUND_JSON = _dumps({'error': 'Algorithm not found'})
+
+# /api/stats is served from memory for this long after it is computed
+_STATS_TTL = 10  # seconds
+_stats_cache = {'expires': 0.0, 'body': None}
+
+@app.route('/api/algorithm-info/<algorithm>')
+def algorithm_info(algorithm):
+    """Get detailed information about a specific algorithm"""
+    blob = _ALGO_JSON.get(algorithm)
+    if blob is None:
+        return _ALGO_NOT_FOUND_JSON, 404, {'Content-Type': 'application/json'}
+    
+    # The payload only changes with a deploy; browsers may keep it for a day
+    # and revalidate with If-None-Match afterwards
+    response = Response(blob, mimetype='application/json')
+    response.set_etag(_ALGO_ETAGS[algorithm])
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
 
 @app.route('/api/stats')
 def get_stats():
     """Get overall statistics"""
-    total_sessions = SortingSession.query.count()
-    algorithm_stats = db.session.query(
-        SortingSession.algorithm,
-        db.func.count(SortingSession.id).label('runs'),
-        db.func.avg(SortingSession.execution_time).label('avg_time'),
-        db.func.avg(SortingSession.comparisons).label('avg_comparisons'),
-        db.func.avg(SortingSession.swaps).label('avg_swaps')
-    ).group_by(SortingSession.algorithm).all()
+    now = time.monotonic()
+    if now < _stats_cache['expires']:
+        return Response(_stats_cache['body'], mimetype='application/json')
+    
+    # AlgorithmStats is kept up to date on every run, so this reads one row
+    # per algorithm instead of aggregating the whole session table
+    algorithm_stats = AlgorithmStats.query.filter(
+        AlgorithmStats.total_runs > 0
+    ).order_by(AlgorithmStats.algorithm).all()
     
     stats = {
-        'total_sessions': total_sessions,
+        'total_sessions': sum(stat.total_runs for stat in algorithm_stats),
         'algorithms': []
     }
     
     for stat in algorithm_stats:
         stats['algorithms'].append({
             'name': stat.algorithm,
-            'runs': stat.runs,
-            'avg_time': round(stat.avg_time, 2) if stat.avg_time else 0,
+            'runs': stat.total_runs,
+            'avg_time': round(stat.avg_execution_time, 2) if stat.avg_execution_time else 0,
             'avg_comparisons': round(stat.avg_comparisons, 2) if stat.avg_comparisons else 0,
             'avg_swaps': round(stat.avg_swaps, 2) if stat.avg_swaps else 0
         })
     
-    return jsonify(stats)
+    body = _dumps(stats)
+    _stats_cache['body'] = body
+    _stats_cache['expires'] = now + _STATS_TTL
+    return Response(body, mimetype='application/json')
@@ -1,13 +1,145 @@
 """
 Sorting algorithms with step-by-step tracking for visualization
+
+The *_sort_steps generators yield each step as it happens and return the
+final result; the *_sort functions collect the steps into that result.
+
+A step is a (type, i, j, v, message) tuple: a code into STEP_TYPES, the
+one or two indices involved (-1 when unused) and the value written, if any.
+Steps carry no array snapshot; the client replays them from the input:
+swap, extract and place_pivot swap i and j, shift copies i into j, and
+insert and place write v at i. merge_start spans i..j split at v.
+The message is a (code into MESSAGES, *args) tuple when verbose is set,
+and None otherwise.
+
+With no step trace wanted, the *_sort functions run the compiled kernels
+from sorting_kernels instead. Those are imported lazily so this module
+needs neither numba nor numpy, and the Python implementations are used
+where Numba is unavailable (PyPy) or USE_PYPY=1 is set.
+
+counting_sort has no step trace. It backs the 'auto' choice for inputs
+whose values span a small range (see is_small_range).
 """
+import array
+import functools
+import os
+
+STEP_TYPES = (
+    'compare', 'swap', 'select', 'shift', 'insert', 'select_min', 'new_min',
+    'merge_start', 'place', 'pivot', 'place_pivot', 'build_heap', 'extract',
+)
+
+(COMPARE, SWAP, SELECT, SHIFT, INSERT, SELECT_MIN, NEW_MIN,
+ MERGE_START, PLACE, PIVOT, PLACE_PIVOT, BUILD_HEAP,
+ EXTRACT) = range(len(STEP_TYPES))
+
+# Step message templates, sent to the client with the step types. A
+# verbose step's message is (template code, *args) and the client fills in
+# the %s placeholders, so the sorts never format strings themselves.
+MESSAGES = (
+    'Comparing %s and %s',
+    'Swapped %s and %s',
+    'Selecting element %s at position %s',
+    'Comparing %s > %s',
+    'Shifting %s to the right',
+    'Inserted %s at position %s',
+    'Finding minimum in unsorted portion starting at %s',
+    'Comparing %s with current minimum %s',
+    'New minimum found: %s',
+    'Swapped %s with %s',
+    'Merging %s and %s',
+    'Placed %s at position %s',
+    'Median of three: comparing %s and %s',
+    'Moved median %s to position %s',
+    'Chosen pivot: %s at position %s',
+    'Comparing %s with pivot %s',
+    'Placed pivot %s at final position %s',
+    'Comparing left child %s with %s',
+    'Comparing right child %s with %s',
+    'Swapped %s and %s to maintain heap property',
+    'Building max heap from bottom up',
+    'Extracted max element %s to position %s',
+)
+
+(MSG_COMPARE, MSG_SWAP, MSG_SELECT, MSG_COMPARE_KEY, MSG_SHIFT,
+ MSG_INSERT, MSG_SELECT_MIN, MSG_COMPARE_MIN, MSG_NEW_MIN,
+ MSG_SWAP_MIN, MSG_MERGE, MSG_PLACE, MSG_MEDIAN, MSG_MOVE_MEDIAN,
+ MSG_PIVOT, MSG_COMPARE_PIVOT, MSG_PLACE_PIVOT, MSG_LEFT_CHILD,
+ MSG_RIGHT_CHILD, MSG_HEAPIFY, MSG_BUILD_HEAP, MSG_EXTRACT) = range(len(MESSAGES))
+
+STEP_FIELDS = ('type', 'i', 'j', 'v', 'message')
 
-def bubble_sort(arr, step_by_step=False):
+# Untraced quick sort insertion sorts ranges of this many elements or fewer
+QUICK_SORT_CUTOFF = 16
+
+def step_columns(steps):
     """
-    Bubble Sort implementation with step tracking
+    Pack a list of steps into one column per field (struct of arrays)
+    """
+    if not steps:
+        return {field: () for field in STEP_FIELDS}
+    return dict(zip(STEP_FIELDS, zip(*steps)))
+
+@functools.cache
+def load_kernels():
+    """
+    Import the compiled kernels module, or return None when it cannot be
+    used. Importing compiles the kernels, so callers may warm it up early.
+    """
+    if os.environ.get('USE_PYPY') == '1':
+        return None
+    try:
+        import sorting_kernels
+    except ImportError:
+        return None
+    return sorting_kernels
+
+def as_int64(values):
+    """
+    Pack integers into a compact int64 array.array, which the kernels copy
+    with a single memcpy. Raises TypeError or OverflowError for values
+    that are not 64-bit integers.
     """
-    arr = arr.copy()
-    steps = []
+    return array.array('q', values)
+
+def is_small_range(arr):
+    """
+    Whether the values of a non-empty arr span fewer than 4 * len(arr)
+    integers, where counting sort beats comparison sorts
+    """
+    return max(arr) - min(arr) < 4 * len(arr)
+
+def _fast_sort(algorithm, arr):
+    """
+    Sort with the compiled kernel, or return None if the kernels are
+    unavailable
+    """
+    kernels = load_kernels()
+    if kernels is None:
+        return None
+    return kernels.run_kernel(algorithm, arr)
+
+def _collect(steps, initial_array):
+    """
+    Drain a step generator, returning its result with the steps attached
+    as columns, along with the array they replay from
+    """
+    recorded = []
+    while True:
+        try:
+            recorded.append(next(steps))
+        except StopIteration as done:
+            result = done.value
+            break
+    result['steps'] = step_columns(recorded)
+    result['initial_array'] = list(initial_array)
+    return result
+
+def bubble_sort_steps(arr, step_by_step=True, verbose=True):
+    """
+    Bubble Sort implementation, yielding steps as they happen
+    """
+    arr = list(arr)
     comparisons = 0
     swaps = 0
     n = len(arr)
@@ -18,13 +150,8 @@ def bubble_sort(arr, step_by_step=False):
             
             # Track comparison step
             if step_by_step:
-                steps.append({
-                    'type': 'compare',
-                    'indices': [j, j + 1],
-                    'values': [arr[j], arr[j + 1]],
-                    'array': arr.copy(),
-                    'message': f'Comparing {arr[j]} and {arr[j + 1]}'
-                })
+                yield (COMPARE, j, j + 1, None,
+                       (MSG_COMPARE, arr[j], arr[j + 1]) if verbose else None)
             
             if arr[j] > arr[j + 1]:
                 arr[j], arr[j + 1] = arr[j + 1], arr[j]
@@ -32,27 +159,20 @@ def bubble_sort(arr, step_by_step=False):
                 
                 # Track swap step
                 if step_by_step:
-                    steps.append({
-                        'type': 'swap',
-                        'indices': [j, j + 1],
-                        'values': [arr[j], arr[j + 1]],
-                        'array': arr.copy(),
-                        'message': f'Swapped {arr[j]} and {arr[j + 1]}'
-                    })
+                    yield (SWAP, j, j + 1, None,
+                           (MSG_SWAP, arr[j], arr[j + 1]) if verbose else None)
     
     return {
         'sorted_array': arr,
-        'steps': steps,
         'comparisons': comparisons,
         'swaps': swaps
     }
 
-def insertion_sort(arr, step_by_step=False):
+def insertion_sort_steps(arr, step_by_step=True, verbose=True):
     """
-    Insertion Sort implementation with step tracking
+    Insertion Sort implementation, yielding steps as they happen
     """
-    arr = arr.copy()
-    steps = []
+    arr = list(arr)
     comparisons = 0
     swaps = 0
     
@@ -61,38 +181,23 @@ def insertion_sort(arr, step_by_step=False):
         j = i - 1
         
         if step_by_step:
-            steps.append({
-                'type': 'select',
-                'indices': [i],
-                'values': [key],
-                'array': arr.copy(),
-                'message': f'Selecting element {key} at position {i}'
-            })
+            yield (SELECT, i, -1, None,
+                   (MSG_SELECT, key, i) if verbose else None)
         
         while j >= 0 and arr[j] > key:
             comparisons += 1
             
             if step_by_step:
-                steps.append({
-                    'type': 'compare',
-                    'indices': [j, j + 1],
-                    'values': [arr[j], key],
-                    'array': arr.copy(),
-                    'message': f'Comparing {arr[j]} > {key}'
-                })
+                yield (COMPARE, j, j + 1, None,
+                       (MSG_COMPARE_KEY, arr[j], key) if verbose else None)
             
             arr[j + 1] = arr[j]
             swaps += 1
             j -= 1
             
             if step_by_step:
-                steps.append({
-                    'type': 'shift',
-                    'indices': [j + 1, j + 2],
-                    'values': [arr[j + 1], arr[j + 2] if j + 2 < len(arr) else None],
-                    'array': arr.copy(),
-                    'message': f'Shifting {arr[j + 1]} to the right'
-                })
+                yield (SHIFT, j + 1, j + 2, None,
+                       (MSG_SHIFT, arr[j + 1]) if verbose else None)
         
         if j >= 0:
             comparisons += 1
@@ -100,27 +205,20 @@ def insertion_sort(arr, step_by_step=False):
         arr[j + 1] = key
         
         if step_by_step:
-            steps.append({
-                'type': 'insert',
-                'indices': [j + 1],
-                'values': [key],
-                'array': arr.copy(),
-                'message': f'Inserted {key} at position {j + 1}'
-            })
+            yield (INSERT, j + 1, -1, key,
+                   (MSG_INSERT, key, j + 1) if verbose else None)
     
     return {
         'sorted_array': arr,
-        'steps': steps,
         'comparisons': comparisons,
         'swaps': swaps
     }
 
-def selection_sort(arr, step_by_step=False):
+def selection_sort_steps(arr, step_by_step=True, verbose=True):
     """
-    Selection Sort implementation with step tracking
+    Selection Sort implementation, yielding steps as they happen
     """
-    arr = arr.copy()
-    steps = []
+    arr = list(arr)
     comparisons = 0
     swaps = 0
     
@@ -128,323 +226,367 @@ def selection_sort(arr, step_by_step=False):
         min_idx = i
         
         if step_by_step:
-            steps.append({
-                'type': 'select_min',
-                'indices': [i],
-                'values': [arr[i]],
-                'array': arr.copy(),
-                'message': f'Finding minimum in unsorted portion starting at {i}'
-            })
+            yield (SELECT_MIN, i, -1, None,
+                   (MSG_SELECT_MIN, i) if verbose else None)
         
         for j in range(i + 1, len(arr)):
             comparisons += 1
             
             if step_by_step:
-                steps.append({
-                    'type': 'compare',
-                    'indices': [j, min_idx],
-                    'values': [arr[j], arr[min_idx]],
-                    'array': arr.copy(),
-                    'message': f'Comparing {arr[j]} with current minimum {arr[min_idx]}'
-                })
+                yield (COMPARE, j, min_idx, None,
+                       (MSG_COMPARE_MIN, arr[j], arr[min_idx]) if verbose else None)
             
             if arr[j] < arr[min_idx]:
                 min_idx = j
                 
                 if step_by_step:
-                    steps.append({
-                        'type': 'new_min',
-                        'indices': [min_idx],
-                        'values': [arr[min_idx]],
-                        'array': arr.copy(),
-                        'message': f'New minimum found: {arr[min_idx]}'
-                    })
+                    yield (NEW_MIN, min_idx, -1, None,
+                           (MSG_NEW_MIN, arr[min_idx]) if verbose else None)
         
         if min_idx != i:
             arr[i], arr[min_idx] = arr[min_idx], arr[i]
             swaps += 1
             
             if step_by_step:
-                steps.append({
-                    'type': 'swap',
-                    'indices': [i, min_idx],
-                    'values': [arr[i], arr[min_idx]],
-                    'array': arr.copy(),
-                    'message': f'Swapped {arr[i]} with {arr[min_idx]}'
-                })
+                yield (SWAP, i, min_idx, None,
+                       (MSG_SWAP_MIN, arr[i], arr[min_idx]) if verbose else None)
     
     return {
         'sorted_array': arr,
-        'steps': steps,
         'comparisons': comparisons,
         'swaps': swaps
     }
 
-def merge_sort(arr, step_by_step=False):
+def merge_sort_steps(arr, step_by_step=True, verbose=True):
     """
-    Merge Sort implementation with step tracking
+    Merge Sort implementation, yielding steps as they happen. Merges
+    bottom-up, runs of width 1, 2, 4, ..., between the array and one
+    scratch buffer that swap roles after every pass.
     """
-    steps = []
-    comparisons = [0]  # Use list to allow modification in nested functions
-    swaps = [0]
+    arr = list(arr)
+    n = len(arr)
+    comparisons = 0
+    swaps = 0
     
-    def merge_sort_recursive(arr, left, right, depth=0):
-        if left < right:
-            mid = (left + right) // 2
-            
-            if step_by_step:
-                steps.append({
-                    'type': 'divide',
-                    'indices': [left, mid, right],
-                    'values': arr[left:right+1],
-                    'array': arr.copy(),
-                    'message': f'Dividing array from {left} to {right} at {mid}'
-                })
-            
-            merge_sort_recursive(arr, left, mid, depth + 1)
-            merge_sort_recursive(arr, mid + 1, right, depth + 1)
-            merge(arr, left, mid, right)
+    src, dst = arr, [0] * n
+    width = 1
     
-    def merge(arr, left, mid, right):
-        # Create temp arrays
-        left_arr = arr[left:mid+1]
-        right_arr = arr[mid+1:right+1]
-        
-        i = j = 0
-        k = left
-        
-        if step_by_step:
-            steps.append({
-                'type': 'merge_start',
-                'indices': [left, mid, right],
-                'values': [left_arr, right_arr],
-                'array': arr.copy(),
-                'message': f'Merging {left_arr} and {right_arr}'
-            })
-        
-        while i < len(left_arr) and j < len(right_arr):
-            comparisons[0] += 1
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
             
-            if step_by_step:
-                steps.append({
-                    'type': 'compare',
-                    'indices': [k],
-                    'values': [left_arr[i], right_arr[j]],
-                    'array': arr.copy(),
-                    'message': f'Comparing {left_arr[i]} and {right_arr[j]}'
-                })
+            if mid >= hi:
+                # Lone run at the end: carried over as it is
+                dst[lo:hi] = src[lo:hi]
+                swaps += hi - lo
+                continue
             
-            if left_arr[i] <= right_arr[j]:
-                arr[k] = left_arr[i]
-                i += 1
-            else:
-                arr[k] = right_arr[j]
-                j += 1
+            if step_by_step:
+                yield (MERGE_START, lo, hi - 1, mid - 1,
+                       (MSG_MERGE, src[lo:mid], src[mid:hi]) if verbose else None)
             
-            swaps[0] += 1
-            k += 1
+            i = lo
+            j = mid
             
-            if step_by_step:
-                steps.append({
-                    'type': 'place',
-                    'indices': [k-1],
-                    'values': [arr[k-1]],
-                    'array': arr.copy(),
-                    'message': f'Placed {arr[k-1]} at position {k-1}'
-                })
-        
-        # Copy remaining elements
-        while i < len(left_arr):
-            arr[k] = left_arr[i]
-            i += 1
-            k += 1
-            swaps[0] += 1
+            for k in range(lo, hi):
+                if i < mid and j < hi:
+                    comparisons += 1
+                    
+                    if step_by_step:
+                        yield (COMPARE, k, -1, None,
+                               (MSG_COMPARE, src[i], src[j]) if verbose else None)
+                    
+                    take_left = src[i] <= src[j]
+                else:
+                    take_left = i < mid
+                
+                if take_left:
+                    dst[k] = src[i]
+                    i += 1
+                else:
+                    dst[k] = src[j]
+                    j += 1
+                
+                swaps += 1
+                
+                if step_by_step:
+                    yield (PLACE, k, -1, dst[k],
+                           (MSG_PLACE, dst[k], k) if verbose else None)
         
-        while j < len(right_arr):
-            arr[k] = right_arr[j]
-            j += 1
-            k += 1
-            swaps[0] += 1
+        src, dst = dst, src
+        width *= 2
     
-    arr_copy = arr.copy()
-    merge_sort_recursive(arr_copy, 0, len(arr_copy) - 1)
+    if src is not arr:
+        arr[:] = src
     
     return {
-        'sorted_array': arr_copy,
-        'steps': steps,
-        'comparisons': comparisons[0],
-        'swaps': swaps[0]
+        'sorted_array': arr,
+        'comparisons': comparisons,
+        'swaps': swaps
     }
 
-def quick_sort(arr, step_by_step=False):
+def quick_sort_steps(arr, step_by_step=True, verbose=True):
     """
-    Quick Sort implementation with step tracking
+    Quick Sort implementation, yielding steps as they happen. Iterative,
+    taking the median of three as pivot. Without a step trace it insertion
+    sorts ranges of QUICK_SORT_CUTOFF elements or fewer, like the kernel;
+    traced runs partition all the way down so the animation shows quick sort.
     """
-    arr = arr.copy()
-    steps = []
-    comparisons = [0]
-    swaps = [0]
+    arr = list(arr)
+    comparisons = 0
+    swaps = 0
+    cutoff = 1 if step_by_step else QUICK_SORT_CUTOFF
     
-    def quick_sort_recursive(arr, low, high):
-        if low < high:
-            pi = partition(arr, low, high)
-            quick_sort_recursive(arr, low, pi - 1)
-            quick_sort_recursive(arr, pi + 1, high)
+    # Explicit stack of (low, high) ranges in place of recursion
+    stack = [(0, len(arr) - 1)]
     
-    def partition(arr, low, high):
+    while stack:
+        low, high = stack.pop()
+        
+        if high - low < cutoff:
+            # Only reached with more than one element untraced, so no steps
+            for i in range(low + 1, high + 1):
+                key = arr[i]
+                j = i - 1
+                
+                while j >= low and arr[j] > key:
+                    comparisons += 1
+                    arr[j + 1] = arr[j]
+                    swaps += 1
+                    j -= 1
+                
+                if j >= low:
+                    comparisons += 1
+                
+                arr[j + 1] = key
+            continue
+        
+        # Order arr[low], arr[mid], arr[high] so the median lands in the
+        # middle. Two elements have no median; the last one is the pivot.
+        if high - low >= 2:
+            mid = (low + high) // 2
+            
+            for a, b in ((low, mid), (low, high), (mid, high)):
+                comparisons += 1
+                
+                if step_by_step:
+                    yield (COMPARE, a, b, None,
+                           (MSG_MEDIAN, arr[a], arr[b]) if verbose else None)
+                
+                if arr[b] < arr[a]:
+                    arr[a], arr[b] = arr[b], arr[a]
+                    swaps += 1
+                    
+                    if step_by_step:
+                        yield (SWAP, a, b, None,
+                               (MSG_SWAP, arr[a], arr[b]) if verbose else None)
+            
+            # Move the median to the end, where the partition takes its pivot
+            arr[mid], arr[high] = arr[high], arr[mid]
+            swaps += 1
+            
+            if step_by_step:
+                yield (SWAP, mid, high, None,
+                       (MSG_MOVE_MEDIAN, arr[high], high) if verbose else None)
+        
         pivot = arr[high]
         
         if step_by_step:
-            steps.append({
-                'type': 'pivot',
-                'indices': [high],
-                'values': [pivot],
-                'array': arr.copy(),
-                'message': f'Chosen pivot: {pivot} at position {high}'
-            })
+            yield (PIVOT, high, -1, None,
+                   (MSG_PIVOT, pivot, high) if verbose else None)
         
         i = low - 1
         
         for j in range(low, high):
-            comparisons[0] += 1
+            comparisons += 1
             
             if step_by_step:
-                steps.append({
-                    'type': 'compare',
-                    'indices': [j, high],
-                    'values': [arr[j], pivot],
-                    'array': arr.copy(),
-                    'message': f'Comparing {arr[j]} with pivot {pivot}'
-                })
+                yield (COMPARE, j, high, None,
+                       (MSG_COMPARE_PIVOT, arr[j], pivot) if verbose else None)
             
             if arr[j] <= pivot:
                 i += 1
                 if i != j:
                     arr[i], arr[j] = arr[j], arr[i]
-                    swaps[0] += 1
+                    swaps += 1
                     
                     if step_by_step:
-                        steps.append({
-                            'type': 'swap',
-                            'indices': [i, j],
-                            'values': [arr[i], arr[j]],
-                            'array': arr.copy(),
-                            'message': f'Swapped {arr[i]} and {arr[j]}'
-                        })
+                        yield (SWAP, i, j, None,
+                               (MSG_SWAP, arr[i], arr[j]) if verbose else None)
         
         arr[i + 1], arr[high] = arr[high], arr[i + 1]
-        swaps[0] += 1
+        swaps += 1
+        pi = i + 1
         
         if step_by_step:
-            steps.append({
-                'type': 'place_pivot',
-                'indices': [i + 1],
-                'values': [arr[i + 1]],
-                'array': arr.copy(),
-                'message': f'Placed pivot {arr[i + 1]} at final position {i + 1}'
-            })
+            yield (PLACE_PIVOT, pi, high, None,
+                   (MSG_PLACE_PIVOT, arr[pi], pi) if verbose else None)
         
-        return i + 1
-    
-    quick_sort_recursive(arr, 0, len(arr) - 1)
+        # Push the larger side first so the smaller one is sorted next,
+        # which keeps the stack O(log n) deep
+        if pi - low < high - pi:
+            stack.append((pi + 1, high))
+            stack.append((low, pi - 1))
+        else:
+            stack.append((low, pi - 1))
+            stack.append((pi + 1, high))
     
     return {
         'sorted_array': arr,
-        'steps': steps,
-        'comparisons': comparisons[0],
-        'swaps': swaps[0]
+        'comparisons': comparisons,
+        'swaps': swaps
     }
 
-def heap_sort(arr, step_by_step=False):
+def heap_sort_steps(arr, step_by_step=True, verbose=True):
     """
-    Heap Sort implementation with step tracking
+    Heap Sort implementation, yielding steps as they happen
     """
-    arr = arr.copy()
-    steps = []
-    comparisons = [0]
-    swaps = [0]
+    arr = list(arr)
+    comparisons = 0
+    swaps = 0
     n = len(arr)
     
     def heapify(arr, n, i):
-        largest = i
-        left = 2 * i + 1
-        right = 2 * i + 2
-        
-        if left < n:
-            comparisons[0] += 1
-            if step_by_step:
-                steps.append({
-                    'type': 'compare',
-                    'indices': [left, largest],
-                    'values': [arr[left], arr[largest]],
-                    'array': arr.copy(),
-                    'message': f'Comparing left child {arr[left]} with {arr[largest]}'
-                })
+        # Sift arr[i] down the heap arr[:n] in a loop rather than recursing
+        nonlocal comparisons, swaps
+        while True:
+            largest = i
+            left = 2 * i + 1
+            right = 2 * i + 2
             
-            if arr[left] > arr[largest]:
-                largest = left
-        
-        if right < n:
-            comparisons[0] += 1
-            if step_by_step:
-                steps.append({
-                    'type': 'compare',
-                    'indices': [right, largest],
-                    'values': [arr[right], arr[largest]],
-                    'array': arr.copy(),
-                    'message': f'Comparing right child {arr[right]} with {arr[largest]}'
-                })
+            if left < n:
+                comparisons += 1
+                if step_by_step:
+                    yield (COMPARE, left, largest, None,
+                           (MSG_LEFT_CHILD, arr[left], arr[largest]) if verbose else None)
+                
+                if arr[left] > arr[largest]:
+                    largest = left
+            
+            if right < n:
+                comparisons += 1
+                if step_by_step:
+                    yield (COMPARE, right, largest, None,
+                           (MSG_RIGHT_CHILD, arr[right], arr[largest]) if verbose else None)
+                
+                if arr[right] > arr[largest]:
+                    largest = right
+            
+            if largest == i:
+                return
             
-            if arr[right] > arr[largest]:
-                largest = right
-        
-        if largest != i:
             arr[i], arr[largest] = arr[largest], arr[i]
-            swaps[0] += 1
+            swaps += 1
             
             if step_by_step:
-                steps.append({
-                    'type': 'swap',
-                    'indices': [i, largest],
-                    'values': [arr[i], arr[largest]],
-                    'array': arr.copy(),
-                    'message': f'Swapped {arr[i]} and {arr[largest]} to maintain heap property'
-                })
+                yield (SWAP, i, largest, None,
+                       (MSG_HEAPIFY, arr[i], arr[largest]) if verbose else None)
             
-            heapify(arr, n, largest)
+            i = largest
     
     # Build max heap
     if step_by_step:
-        steps.append({
-            'type': 'build_heap',
-            'indices': [],
-            'values': [],
-            'array': arr.copy(),
-            'message': 'Building max heap from bottom up'
-        })
+        yield (BUILD_HEAP, -1, -1, None,
+               (MSG_BUILD_HEAP,) if verbose else None)
     
     for i in range(n // 2 - 1, -1, -1):
-        heapify(arr, n, i)
+        yield from heapify(arr, n, i)
     
     # Extract elements one by one
     for i in range(n - 1, 0, -1):
         arr[0], arr[i] = arr[i], arr[0]
-        swaps[0] += 1
+        swaps += 1
         
         if step_by_step:
-            steps.append({
-                'type': 'extract',
-                'indices': [0, i],
-                'values': [arr[0], arr[i]],
-                'array': arr.copy(),
-                'message': f'Extracted max element {arr[i]} to position {i}'
-            })
+            yield (EXTRACT, 0, i, None,
+                   (MSG_EXTRACT, arr[i], i) if verbose else None)
         
-        heapify(arr, i, 0)
+        yield from heapify(arr, i, 0)
     
     return {
         'sorted_array': arr,
-        'steps': steps,
-        'comparisons': comparisons[0],
-        'swaps': swaps[0]
+        'comparisons': comparisons,
+        'swaps': swaps
+    }
+
+def bubble_sort(arr, step_by_step=False, verbose=True):
+    """
+    Bubble Sort implementation with step tracking
+    """
+    if not step_by_step:
+        result = _fast_sort('bubble', arr)
+        if result is not None:
+            return result
+    return _collect(bubble_sort_steps(arr, step_by_step, verbose), arr)
+
+def insertion_sort(arr, step_by_step=False, verbose=True):
+    """
+    Insertion Sort implementation with step tracking
+    """
+    if not step_by_step:
+        result = _fast_sort('insertion', arr)
+        if result is not None:
+            return result
+    return _collect(insertion_sort_steps(arr, step_by_step, verbose), arr)
+
+def selection_sort(arr, step_by_step=False, verbose=True):
+    """
+    Selection Sort implementation with step tracking
+    """
+    if not step_by_step:
+        result = _fast_sort('selection', arr)
+        if result is not None:
+            return result
+    return _collect(selection_sort_steps(arr, step_by_step, verbose), arr)
+
+def merge_sort(arr, step_by_step=False, verbose=True):
+    """
+    Merge Sort implementation with step tracking
+    """
+    if not step_by_step:
+        result = _fast_sort('merge', arr)
+        if result is not None:
+            return result
+    return _collect(merge_sort_steps(arr, step_by_step, verbose), arr)
+
+def quick_sort(arr, step_by_step=False, verbose=True):
+    """
+    Quick Sort implementation with step tracking
+    """
+    if not step_by_step:
+        result = _fast_sort('quick', arr)
+        if result is not None:
+            return result
+    return _collect(quick_sort_steps(arr, step_by_step, verbose), arr)
+
+def heap_sort(arr, step_by_step=False, verbose=True):
+    """
+    Heap Sort implementation with step tracking
+    """
+    if not step_by_step:
+        result = _fast_sort('heap', arr)
+        if result is not None:
+            return result
+    return _collect(heap_sort_steps(arr, step_by_step, verbose), arr)
+
+def counting_sort(arr):
+    """
+    Counting Sort for integers spanning a small range. It makes no
+    comparisons; writing each value back counts as one swap.
+    """
+    kernels = load_kernels()
+    if kernels is not None:
+        return kernels.counting_sort(arr)
+
+    lo = min(arr)
+    counts = [0] * (max(arr) - lo + 1)
+    for value in arr:
+        counts[value - lo] += 1
+
+    return {
+        'sorted_array': [value for value, count in enumerate(counts, lo) for _ in range(count)],
+        'steps': [],
+        'comparisons': 0,
+        'swaps': len(arr)
     }
@@ -0,0 +1,318 @@
+"""
+Numba-compiled sorting kernels for the fast (non step-by-step) path
+"""
+import numpy as np
+from numba import njit
+
+from sorting_algorithms import QUICK_SORT_CUTOFF
+
+# (sorted array, comparisons, swaps) from a 1-D int64 array. Passing the
+# signature compiles each kernel when this module is imported, so the first
+# request does not pay for LLVM code generation. Kernels release the GIL so
+# races can run them on parallel threads.
+KERNEL_SIGNATURE = 'Tuple((int64[:], int64, int64))(int64[:])'
+
+
+@njit(KERNEL_SIGNATURE, nogil=True, cache=True)
+def bubble_sort_kernel(arr):
+    """
+    Bubble Sort kernel, counting like sorting_algorithms.bubble_sort
+    """
+    comparisons = 0
+    swaps = 0
+    n = len(arr)
+
+    for i in range(n):
+        for j in range(0, n - i - 1):
+            comparisons += 1
+            if arr[j] > arr[j + 1]:
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                swaps += 1
+
+    return arr, comparisons, swaps
+
+
+@njit(KERNEL_SIGNATURE, nogil=True, cache=True)
+def insertion_sort_kernel(arr):
+    """
+    Insertion Sort kernel, counting like sorting_algorithms.insertion_sort
+    """
+    comparisons = 0
+    swaps = 0
+
+    for i in range(1, len(arr)):
+        key = arr[i]
+        j = i - 1
+
+        while j >= 0 and arr[j] > key:
+            comparisons += 1
+            arr[j + 1] = arr[j]
+            swaps += 1
+            j -= 1
+
+        if j >= 0:
+            comparisons += 1
+
+        arr[j + 1] = key
+
+    return arr, comparisons, swaps
+
+
+@njit(KERNEL_SIGNATURE, nogil=True, cache=True)
+def selection_sort_kernel(arr):
+    """
+    Selection Sort kernel, counting like sorting_algorithms.selection_sort
+    """
+    comparisons = 0
+    swaps = 0
+    n = len(arr)
+
+    for i in range(n):
+        min_idx = i
+
+        for j in range(i + 1, n):
+            comparisons += 1
+            if arr[j] < arr[min_idx]:
+                min_idx = j
+
+        if min_idx != i:
+            arr[i], arr[min_idx] = arr[min_idx], arr[i]
+            swaps += 1
+
+    return arr, comparisons, swaps
+
+
+@njit(KERNEL_SIGNATURE, nogil=True, cache=True)
+def merge_sort_kernel(arr):
+    """
+    Merge Sort kernel, counting like sorting_algorithms.merge_sort
+    """
+    comparisons = 0
+    swaps = 0
+    n = len(arr)
+
+    # Bottom-up passes, ping-ponging between arr and one scratch buffer
+    src = arr
+    dst = np.empty_like(arr)
+    width = 1
+
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            i = lo
+            j = mid
+
+            for k in range(lo, hi):
+                if i < mid and j < hi:
+                    comparisons += 1
+                    take_left = src[i] <= src[j]
+                else:
+                    take_left = i < mid
+
+                if take_left:
+                    dst[k] = src[i]
+                    i += 1
+                else:
+                    dst[k] = src[j]
+                    j += 1
+
+            swaps += hi - lo
+
+        src, dst = dst, src
+        width *= 2
+
+    if src is not arr:
+        arr[:] = src
+
+    return arr, comparisons, swaps
+
+
+@njit(KERNEL_SIGNATURE, nogil=True, cache=True)
+def quick_sort_kernel(arr):
+    """
+    Quick Sort kernel, counting like sorting_algorithms.quick_sort
+    """
+    comparisons = 0
+    swaps = 0
+
+    # Explicit stack of (low, high) ranges in place of recursion. Sorting
+    # the smaller side first leaves at most log2(n) + 1 ranges pending.
+    stack = np.empty(2 * 64 + 2, dtype=np.int64)
+    top = 0
+    stack[top] = 0
+    stack[top + 1] = len(arr) - 1
+    top += 2
+
+    while top > 0:
+        top -= 2
+        low = stack[top]
+        high = stack[top + 1]
+
+        if high - low < QUICK_SORT_CUTOFF:
+            for i in range(low + 1, high + 1):
+                key = arr[i]
+                j = i - 1
+
+                while j >= low and arr[j] > key:
+                    comparisons += 1
+                    arr[j + 1] = arr[j]
+                    swaps += 1
+                    j -= 1
+
+                if j >= low:
+                    comparisons += 1
+
+                arr[j + 1] = key
+            continue
+
+        # Median of three, then moved to the end as the pivot
+        mid = (low + high) // 2
+        comparisons += 3
+        if arr[mid] < arr[low]:
+            arr[low], arr[mid] = arr[mid], arr[low]
+            swaps += 1
+        if arr[high] < arr[low]:
+            arr[low], arr[high] = arr[high], arr[low]
+            swaps += 1
+        if arr[high] < arr[mid]:
+            arr[mid], arr[high] = arr[high], arr[mid]
+            swaps += 1
+
+        arr[mid], arr[high] = arr[high], arr[mid]
+        swaps += 1
+        pivot = arr[high]
+        i = low - 1
+
+        for j in range(low, high):
+            comparisons += 1
+            if arr[j] <= pivot:
+                i += 1
+                if i != j:
+                    arr[i], arr[j] = arr[j], arr[i]
+                    swaps += 1
+
+        arr[i + 1], arr[high] = arr[high], arr[i + 1]
+        swaps += 1
+        pi = i + 1
+
+        # Push the larger side first so the smaller one is sorted next
+        if pi - low < high - pi:
+            stack[top] = pi + 1
+            stack[top + 1] = high
+            stack[top + 2] = low
+            stack[top + 3] = pi - 1
+        else:
+            stack[top] = low
+            stack[top + 1] = pi - 1
+            stack[top + 2] = pi + 1
+            stack[top + 3] = high
+        top += 4
+
+    return arr, comparisons, swaps
+
+
+@njit('UniTuple(int64, 2)(int64[:], int64, int64)', nogil=True, cache=True)
+def _sift_down(arr, n, i):
+    """
+    Sift arr[i] down the max heap arr[:n], returning (comparisons, swaps)
+    """
+    comparisons = 0
+    swaps = 0
+
+    while True:
+        largest = i
+        left = 2 * i + 1
+        right = 2 * i + 2
+
+        if left < n:
+            comparisons += 1
+            if arr[left] > arr[largest]:
+                largest = left
+
+        if right < n:
+            comparisons += 1
+            if arr[right] > arr[largest]:
+                largest = right
+
+        if largest == i:
+            break
+
+        arr[i], arr[largest] = arr[largest], arr[i]
+        swaps += 1
+        i = largest
+
+    return comparisons, swaps
+
+
+@njit(KERNEL_SIGNATURE, nogil=True, cache=True)
+def heap_sort_kernel(arr):
+    """
+    Heap Sort kernel, counting like sorting_algorithms.heap_sort
+    """
+    comparisons = 0
+    swaps = 0
+    n = len(arr)
+
+    for i in range(n // 2 - 1, -1, -1):
+        c, s = _sift_down(arr, n, i)
+        comparisons += c
+        swaps += s
+
+    for i in range(n - 1, 0, -1):
+        arr[0], arr[i] = arr[i], arr[0]
+        swaps += 1
+
+        c, s = _sift_down(arr, i, 0)
+        comparisons += c
+        swaps += s
+
+    return arr, comparisons, swaps
+
+
+KERNELS = {
+    'bubble': bubble_sort_kernel,
+    'insertion': insertion_sort_kernel,
+    'selection': selection_sort_kernel,
+    'merge': merge_sort_kernel,
+    'quick': quick_sort_kernel,
+    'heap': heap_sort_kernel
+}
+
+# The first call into any kernel also sets up Numba's runtime, which takes
+# several milliseconds. Pay for it at import rather than in the first timed
+# sort, whose timing would otherwise be cached and reported for repeats.
+for _kernel in KERNELS.values():
+    _kernel(np.arange(4, dtype=np.int64))
+
+
+def run_kernel(algorithm, arr):
+    """
+    Sort a copy of arr with the named kernel, returning a result shaped like
+    the sorting_algorithms sorts. An int64 buffer such as
+    sorting_algorithms.as_int64 returns is copied without per-element
+    conversion.
+    """
+    sorted_array, comparisons, swaps = KERNELS[algorithm](np.array(arr, dtype=np.int64))
+    return {
+        'sorted_array': sorted_array.tolist(),
+        'steps': [],
+        'comparisons': comparisons,
+        'swaps': swaps
+    }
+
+
+def counting_sort(arr):
+    """
+    Counting sort with numpy.bincount, counting like
+    sorting_algorithms.counting_sort
+    """
+    a = np.asarray(arr, dtype=np.int64)
+    lo = a.min()
+    sorted_array = np.repeat(np.arange(lo, a.max() + 1), np.bincount(a - lo))
+    return {
+        'sorted_array': sorted_array.tolist(),
+        'steps': [],
+        'comparisons': 0,
+        'swaps': len(a)
+    }
@@ -12,6 +12,10 @@ let visualizerState = {
     sortingSteps: [],
     currentStep: 0,
     isAnimating: false,
+    isStreaming: false,
+    sortRun: null,
+    sortAbort: null,
+    stepsArrived: null,
     animationSpeed: 5,
     theme: 'bars',
     colors: {
@@ -104,6 +108,8 @@ function setVisualizationArray(array) {
     visualizerState.sortingSteps = [];
     visualizerState.currentStep = 0;
     visualizerState.isAnimating = false;
+    visualizerState.sortRun = null;
+    stopSortStream();
     
     resetStatistics();
     drawVisualization();
@@ -181,10 +187,19 @@ async function startSorting() {
     
     showNotification(`Starting ${getAlgorithmName(algorithm)} sort...`, 'info', 2000);
     
+    // Cancel any earlier stream and detach its run, so its cleanup cannot
+    // touch this one; stopSortStream also aborts this stream when the
+    // visualization is reset or given a new array
+    stopSortStream();
+    visualizerState.sortRun = null;
+    const controller = new AbortController();
+    visualizerState.sortAbort = controller;
+    
     try {
         // Get sorting steps from server
         const response = await fetch('/api/sort', {
             method: 'POST',
+            signal: controller.signal,
             headers: {
                 'Content-Type': 'application/json'
             },
@@ -192,6 +207,7 @@ async function startSorting() {
                 algorithm: algorithm,
                 array: visualizerState.originalArray,
                 stepByStep: true,
+                verbose: true,
                 mode: 'learn'
             })
         });
@@ -200,46 +216,225 @@ async function startSorting() {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
         
-        const result = await response.json();
+        // Animate steps as they arrive instead of waiting for the whole trace
+        const run = {};
+        visualizerState.sortRun = run;
+        visualizerState.isStreaming = true;
+        visualizerState.sortingSteps = [];
+        visualizerState.currentStep = 0;
+        visualizerState.currentArray = [...visualizerState.originalArray];
+        visualizerState.isAnimating = true;
+        updateControlButtons();
+        const animation = animateSortingSteps();
         
-        if (result.error) {
-            throw new Error(result.error);
+        let result;
+        try {
+            result = await readSortStream(response, {
+                onStart: (initialArray) => {
+                    if (visualizerState.sortRun === run && initialArray) {
+                        visualizerState.currentArray = [...initialArray];
+                    }
+                },
+                onSteps: (steps) => {
+                    if (visualizerState.sortRun === run) {
+                        visualizerState.sortingSteps.push(...steps);
+                        notifyStepsArrived();
+                    }
+                }
+            });
+        } catch (error) {
+            if (visualizerState.sortRun === run) {
+                visualizerState.isAnimating = false;
+            }
+            throw error;
+        } finally {
+            if (visualizerState.sortAbort === controller) {
+                stopSortStream();
+            }
         }
         
-        visualizerState.sortingSteps = result.steps || [];
-        visualizerState.currentStep = 0;
+        // Update statistics, unless a reset or new array replaced this run
+        if (visualizerState.sortRun === run) {
+            updateStatistics({
+                comparisons: result.comparisons || 0,
+                swaps: result.swaps || 0,
+                executionTime: result.execution_time || 0
+            });
+        }
         
-        // Update statistics
-        updateStatistics({
-            comparisons: result.comparisons || 0,
-            swaps: result.swaps || 0,
-            executionTime: result.execution_time || 0
-        });
+        await animation;
         
-        // Start animation
-        if (visualizerState.sortingSteps.length > 0) {
-            visualizerState.isAnimating = true;
-            updateControlButtons();
-            await animateSortingSteps();
-        } else {
+        if (visualizerState.sortRun === run && visualizerState.sortingSteps.length === 0) {
             showNotification('No sorting steps generated', 'warning');
         }
         
     } catch (error) {
+        // Aborted by a reset or a new array, which already tidied up
+        if (error.name === 'AbortError') return;
+        
         console.error('Error starting sort:', error);
         showNotification('Error starting sort: ' + error.message, 'error');
     }
 }
 
+/**
+ * Stop following the current sort stream, cancelling its download, and
+ * wake the animation so it can finish with the steps it already has
+ */
+function stopSortStream() {
+    visualizerState.isStreaming = false;
+    if (visualizerState.sortAbort) {
+        visualizerState.sortAbort.abort();
+        visualizerState.sortAbort = null;
+    }
+    notifyStepsArrived();
+}
+
+/**
+ * Wake an animation waiting for more streamed steps
+ */
+function notifyStepsArrived() {
+    const resolve = visualizerState.stepsArrived;
+    visualizerState.stepsArrived = null;
+    if (resolve) resolve();
+}
+
+/**
+ * Wait until more streamed steps arrive or the stream ends
+ * @returns {Promise} Resolved by notifyStepsArrived
+ */
+function waitForSteps() {
+    return new Promise(resolve => {
+        visualizerState.stepsArrived = resolve;
+    });
+}
+
+/**
+ * Fill in a step message template
+ * @param {Array} templates - Message templates from the stream
+ * @param {Array|null} message - Template code followed by its arguments
+ * @returns {string|null} Formatted message, or null if there is none
+ */
+function formatStepMessage(templates, message) {
+    if (!message) return null;
+    
+    let next = 1;
+    return templates[message[0]].replace(/%s/g, () => {
+        const arg = message[next++];
+        return Array.isArray(arg) ? `[${arg.join(', ')}]` : String(arg);
+    });
+}
+
+/**
+ * Read a step-by-step sort streamed as NDJSON: a line naming the step type
+ * codes and message templates and carrying the initial array, frames of
+ * steps packed as columns, then a summary line with done set
+ * @param {Response} response - Streaming response from /api/sort
+ * @param {Object} handlers - Optional onStart(initialArray) and onSteps(steps)
+ *     callbacks, called as the lines arrive
+ * @returns {Object} Summary line with the initial array and steps attached
+ */
+async function readSortStream(response, handlers = {}) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    const steps = [];
+    let stepTypes = [];
+    let messages = [];
+    let initialArray = null;
+    let summary = null;
+    let pending = '';
+    
+    const handleLine = (line) => {
+        if (!line) return;
+        
+        const message = JSON.parse(line);
+        if (message.error) {
+            throw new Error(message.error);
+        }
+        
+        if (message.done) {
+            summary = message;
+        } else if (message.step_types) {
+            stepTypes = message.step_types;
+            messages = message.messages;
+            initialArray = message.initial_array;
+            if (handlers.onStart) handlers.onStart(initialArray);
+        } else {
+            const first = steps.length;
+            for (let k = 0; k < message.type.length; k++) {
+                const i = message.i[k];
+                const j = message.j[k];
+                steps.push({
+                    type: stepTypes[message.type[k]],
+                    i: i,
+                    j: j,
+                    v: message.v[k],
+                    indices: [i, j].filter(index => index >= 0),
+                    message: formatStepMessage(messages, message.message[k])
+                });
+            }
+            if (handlers.onSteps) handlers.onSteps(steps.slice(first));
+        }
+    };
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        
+        pending += decoder.decode(value, { stream: true });
+        const lines = pending.split('\n');
+        pending = lines.pop();
+        lines.forEach(handleLine);
+    }
+    handleLine(pending + decoder.decode());
+    
+    if (!summary) {
+        throw new Error('Sort stream ended unexpectedly');
+    }
+    
+    return { ...summary, initial_array: initialArray, steps };
+}
+
+/**
+ * Apply a step's write, if any, to the current array. Steps carry no array
+ * snapshot, so the array is rebuilt by replaying them from the original.
+ * @param {Object} step - Sorting step
+ */
+function applyStep(step) {
+    const array = visualizerState.currentArray;
+    
+    switch (step.type) {
+        case 'swap':
+        case 'extract':
+        case 'place_pivot':
+            [array[step.i], array[step.j]] = [array[step.j], array[step.i]];
+            break;
+        case 'shift':
+            array[step.j] = array[step.i];
+            break;
+        case 'insert':
+        case 'place':
+            array[step.i] = step.v;
+            break;
+    }
+}
+
 /**
  * Animate sorting steps
  */
 async function animateSortingSteps() {
-    while (visualizerState.currentStep < visualizerState.sortingSteps.length && visualizerState.isAnimating) {
+    while (visualizerState.isAnimating) {
+        if (visualizerState.currentStep >= visualizerState.sortingSteps.length) {
+            // Caught up with the stream: wait for the next frame, or stop
+            if (!visualizerState.isStreaming) break;
+            await waitForSteps();
+            continue;
+        }
+        
         const step = visualizerState.sortingSteps[visualizerState.currentStep];
         
         // Update array state
-        visualizerState.currentArray = [...step.array];
+        applyStep(step);
         
         // Update step description
         updateStepDescription(step);
@@ -258,7 +453,8 @@ async function animateSortingSteps() {
     visualizerState.isAnimating = false;
     updateControlButtons();
     
-    if (visualizerState.currentStep >= visualizerState.sortingSteps.length) {
+    if (!visualizerState.isStreaming && visualizerState.sortingSteps.length > 0 &&
+        visualizerState.currentStep >= visualizerState.sortingSteps.length) {
         showNotification('Sorting completed!', 'success');
         celebrateCompletion();
     }
@@ -273,6 +469,9 @@ function pauseVisualization() {
     
     if (visualizerState.isAnimating) {
         animateSortingSteps();
+    } else {
+        // Let an animation waiting on the stream see the pause and exit
+        notifyStepsArrived();
     }
 }
 
@@ -283,7 +482,7 @@ function stepForward() {
     if (visualizerState.currentStep < visualizerState.sortingSteps.length) {
         const step = visualizerState.sortingSteps[visualizerState.currentStep];
         
-        visualizerState.currentArray = [...step.array];
+        applyStep(step);
         updateStepDescription(step);
         drawVisualization(step);
         
@@ -304,6 +503,8 @@ function resetVisualization() {
     visualizerState.currentStep = 0;
     visualizerState.currentArray = [...visualizerState.originalArray];
     visualizerState.sortingSteps = [];
+    visualizerState.sortRun = null;
+    stopSortStream();
     
     resetStatistics();
     updateControlButtons();
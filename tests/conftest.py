@@ -0,0 +1,5 @@
+import os
+
+# app reads DATABASE_URL when it is imported, so point it at a throwaway
+# in-memory database before any test imports it
+os.environ['DATABASE_URL'] = 'sqlite://'
@@ -0,0 +1,86 @@
+"""
+metrics_writer: the AlgorithmStats upsert keeps correct running averages
+"""
+import pytest
+
+from app import app, db
+import metrics_writer
+from models import AlgorithmStats, SortingSession
+
+
+@pytest.fixture
+def session():
+    with app.app_context():
+        metrics_writer.flush()
+        AlgorithmStats.query.delete()
+        SortingSession.query.delete()
+        db.session.commit()
+        yield db.session
+        db.session.rollback()
+
+
+def _row(algorithm, runs, comparisons, swaps, execution_time, wins=0):
+    return {
+        'algorithm': algorithm,
+        'total_runs': runs,
+        'avg_comparisons': comparisons,
+        'avg_swaps': swaps,
+        'avg_execution_time': execution_time,
+        'wins': wins
+    }
+
+
+def _stats():
+    return {
+        stat.algorithm: (stat.total_runs, stat.avg_comparisons, stat.avg_swaps,
+                         stat.avg_execution_time, stat.wins)
+        for stat in AlgorithmStats.query
+    }
+
+
+@pytest.fixture(params=['upsert', 'update-insert'])
+def dialect(request, monkeypatch):
+    # The fallback path is what dialects without ON CONFLICT use
+    if request.param == 'update-insert':
+        monkeypatch.setattr(metrics_writer, '_UPSERT_INSERTS', {})
+    return request.param
+
+
+def test_upsert_folds_batches_into_running_means(session, dialect):
+    metrics_writer._upsert_stats([_row('quick', 2, 10, 4, 1.0, wins=1), _row('heap', 1, 30, 9, 2.0)])
+    session.commit()
+    metrics_writer._upsert_stats([_row('quick', 1, 40, 1, 4.0, wins=1)])
+    session.commit()
+    
+    assert _stats() == {
+        'quick': (3, 20.0, 3.0, 2.0, 2),
+        'heap': (1, 30.0, 9.0, 2.0, 0)
+    }
+
+
+def test_recorded_sessions_reach_stats(session):
+    for comparisons in (10, 20, 60):
+        metrics_writer.record(dict(algorithm='merge', array_size=5, comparisons=comparisons,
+                                   swaps=2, execution_time=0.5, mode='learn'))
+    metrics_writer.record(dict(algorithm='merge', array_size=5, comparisons=30, swaps=2,
+                               execution_time=0.5, mode='game'), wins=1)
+    assert metrics_writer.flush(timeout=5)
+    
+    assert SortingSession.query.count() == 4
+    assert _stats() == {'merge': (4, 30.0, 2.0, 0.5, 1)}
+
+
+def test_backfill_counts_existing_sessions(session):
+    session.execute(SortingSession.__table__.insert(), [
+        dict(algorithm='bubble', array_size=3, comparisons=3, swaps=1, execution_time=1.0, mode='learn'),
+        dict(algorithm='bubble', array_size=3, comparisons=5, swaps=3, execution_time=3.0, mode='learn')
+    ])
+    session.add(AlgorithmStats(algorithm='bubble', wins=2))
+    session.commit()
+    
+    metrics_writer._backfill_stats()
+    assert _stats() == {'bubble': (2, 4.0, 2.0, 2.0, 2)}
+    
+    # Only once: stats that already count runs are left alone
+    metrics_writer._backfill_stats()
+    assert _stats() == {'bubble': (2, 4.0, 2.0, 2.0, 2)}
@@ -0,0 +1,87 @@
+"""
+Sorting algorithms: kernel and Python counts agree, and step traces replay
+to the sorted array
+"""
+import random
+
+import pytest
+
+import sorting_algorithms
+from sorting_algorithms import MESSAGES, STEP_TYPES
+
+ALGORITHMS = ['bubble', 'insertion', 'selection', 'merge', 'quick', 'heap']
+
+# Empty, tiny, around QUICK_SORT_CUTOFF, and larger than the UI allows
+SIZES = [0, 1, 2, 3, 10, 16, 17, 33, 100, 257]
+
+
+def _inputs():
+    rng = random.Random(0)
+    for n in SIZES:
+        yield [rng.randint(1, 100) for _ in range(n)]
+        yield [rng.randint(-10**9, 10**9) for _ in range(n)]
+        yield list(range(n))
+        yield list(range(n, 0, -1))
+        yield [7] * n
+
+
+def _steps(algorithm):
+    return getattr(sorting_algorithms, algorithm + '_sort_steps')
+
+
+def _replay(initial_array, steps):
+    """Rebuild the array from a step trace the way visualizer.js does"""
+    arr = list(initial_array)
+    for code, i, j, v in zip(steps['type'], steps['i'], steps['j'], steps['v']):
+        step_type = STEP_TYPES[code]
+        if step_type in ('swap', 'extract', 'place_pivot'):
+            arr[i], arr[j] = arr[j], arr[i]
+        elif step_type == 'shift':
+            arr[j] = arr[i]
+        elif step_type in ('insert', 'place'):
+            arr[i] = v
+    return arr
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_kernel_counts_match_python(algorithm):
+    kernels = sorting_algorithms.load_kernels()
+    if kernels is None:
+        pytest.skip('compiled kernels unavailable')
+    
+    for arr in _inputs():
+        if not arr:
+            continue
+        expected = sorting_algorithms._collect(_steps(algorithm)(arr, step_by_step=False), arr)
+        result = kernels.run_kernel(algorithm, sorting_algorithms.as_int64(arr))
+        assert result['sorted_array'] == sorted(arr)
+        assert (result['comparisons'], result['swaps']) == (expected['comparisons'], expected['swaps'])
+
+
+def test_counting_sort_matches_python():
+    kernels = sorting_algorithms.load_kernels()
+    if kernels is None:
+        pytest.skip('compiled kernels unavailable')
+    
+    for arr in _inputs():
+        if arr and sorting_algorithms.is_small_range(arr):
+            assert kernels.counting_sort(arr) == sorting_algorithms.counting_sort(arr)
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_steps_replay_to_sorted_array(algorithm):
+    for arr in _inputs():
+        result = sorting_algorithms._collect(_steps(algorithm)(arr), arr)
+        assert result['sorted_array'] == sorted(arr)
+        assert _replay(result['initial_array'], result['steps']) == sorted(arr)
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_step_messages(algorithm):
+    arr = [5, 3, 9, 1, 7, 2, 8, 6, 4, 0]
+    verbose = sorting_algorithms._collect(_steps(algorithm)(arr), arr)['steps']['message']
+    quiet = sorting_algorithms._collect(_steps(algorithm)(arr, verbose=False), arr)['steps']['message']
+    
+    for message in verbose:
+        assert '%' not in MESSAGES[message[0]] % message[1:]
+    assert set(quiet) == {None}